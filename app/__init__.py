@@ -8,5 +8,8 @@ def create_app():
     
     from app.routes import bp
     app.register_blueprint(bp, url_prefix='/gitload')
+
+    from app.services import prefetch_service
+    prefetch_service.start(app)
     
     return app
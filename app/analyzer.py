@@ -8,7 +8,7 @@ Jede Klasse liefert
 from __future__ import annotations
 from pathlib import Path
 import ast
-import re
+import importlib
 from collections import defaultdict
 from typing import List, Dict
 
@@ -45,6 +45,11 @@ class PythonAnalyzer(BaseAnalyzer):
         except SyntaxError:
             return []
 
+        # Parent-Links für _enclosing_class (sonst bliebe "class" immer leer)
+        for parent in ast.walk(tree):
+            for child in ast.iter_child_nodes(parent):
+                child.parent = parent  # type: ignore
+
         rows: List[Dict] = []
         for node in ast.walk(tree):
             if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
@@ -184,19 +189,75 @@ class PythonAnalyzer(BaseAnalyzer):
         return ""
 
 
-class CSSAnalyzer(BaseAnalyzer):
-    _sel = re.compile(r"^\s*([^\{]+?)\s*\{", re.MULTILINE)
+# ───────── Registry ──────────────────────────────────────────────
+# Weitere Analyzer werden erst importiert, wenn ihre Endung zum ersten Mal
+# auftaucht ("modul:Klasse"). Zusätzlich können Pakete Analyzer über die
+# Entry-Point-Gruppe "gitload.analyzers" beisteuern (Name = Endung, z.B. ".rs").
+_LAZY_ANALYZERS = {
+    ".js":  "app.analyzers.javascript:JavaScriptAnalyzer",
+    ".jsx": "app.analyzers.javascript:JavaScriptAnalyzer",
+    ".mjs": "app.analyzers.javascript:JavaScriptAnalyzer",
+    ".cjs": "app.analyzers.javascript:JavaScriptAnalyzer",
+    ".ts":  "app.analyzers.javascript:JavaScriptAnalyzer",
+    ".tsx": "app.analyzers.javascript:JavaScriptAnalyzer",
+    ".mts": "app.analyzers.javascript:JavaScriptAnalyzer",
+    ".cts": "app.analyzers.javascript:JavaScriptAnalyzer",
+    ".css": "app.analyzers.css:CSSAnalyzer",
+}
+ENTRY_POINT_GROUP = "gitload.analyzers"
 
-    def analyse(self, rel_path: str, text: str) -> List[Dict]:
-        return [
-            {"file": rel_path, "func": m.group(1).strip()}
-            for m in self._sel.finditer(text)
-        ]
 
+def _entry_points() -> Dict[str, object]:
+    """Endung → EntryPoint (nur Metadaten, noch kein Import)."""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # pragma: no cover
+        return {}
+    eps = entry_points()
+    group = eps.select(group=ENTRY_POINT_GROUP) if hasattr(eps, "select") \
+        else eps.get(ENTRY_POINT_GROUP, [])
+    return {
+        (ep.name if ep.name.startswith(".") else f".{ep.name}").lower(): ep
+        for ep in group
+    }
 
-# ───────── Registry ──────────────────────────────────────────────
-REGISTRY = defaultdict(BaseAnalyzer)
+
+class _LazyRegistry(dict):
+    """
+    Verhält sich wie defaultdict(BaseAnalyzer): unbekannte Endungen liefern
+    einen leeren BaseAnalyzer. Bekannte Endungen laden ihr Modul beim ersten
+    Zugriff; Instanzen werden je Klasse geteilt.
+    """
+
+    def __init__(self, lazy: Dict[str, str]):
+        super().__init__()
+        self._lazy = dict(lazy)
+        self._eps: Dict[str, object] | None = None
+        self._instances: Dict[str, BaseAnalyzer] = {}
+
+    def __missing__(self, suffix: str) -> BaseAnalyzer:
+        target = self._lazy.get(suffix)
+        if target:
+            analyzer = self._instances.get(target)
+            if analyzer is None:
+                mod_name, cls_name = target.split(":")
+                cls = getattr(importlib.import_module(mod_name), cls_name)
+                analyzer = self._instances[target] = cls()
+        else:
+            if self._eps is None:
+                self._eps = _entry_points()
+            ep = self._eps.get(suffix)
+            analyzer = ep.load()() if ep is not None else BaseAnalyzer()
+        self[suffix] = analyzer
+        return analyzer
+
+    def register(self, suffix: str, target: str) -> None:
+        """Analyzer für eine Endung nachträglich (lazy) eintragen."""
+        self._lazy[suffix] = target
+        self.pop(suffix, None)
+
+
+REGISTRY = _LazyRegistry(_LAZY_ANALYZERS)
 REGISTRY.update({
     ".py": PythonAnalyzer(),
-    # ".css": CSSAnalyzer(),
 })
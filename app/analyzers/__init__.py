@@ -0,0 +1,5 @@
+# app/analyzers/__init__.py
+"""
+Zusätzliche Analyzer, die erst beim ersten Auftreten ihrer Dateiendung
+importiert werden (siehe app.analyzer._LAZY_ANALYZERS).
+"""
@@ -0,0 +1,90 @@
+# app/analyzers/css.py
+"""
+Analyzer für Stylesheets (.css). Selektoren werden wie Funktionen
+behandelt, @import-Regeln wie Imports. Umschließende At-Regeln
+(@media, @supports, ...) landen in der Spalte "class".
+"""
+from __future__ import annotations
+import re
+from bisect import bisect_right
+from typing import List, Dict
+
+from app.analyzer import BaseAnalyzer
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_IMPORT  = re.compile(r"@import\s+(?:url\(\s*)?(['\"]?)([^'\")\s;]+)\1")
+_TOKEN   = re.compile(r"[{};]")
+
+
+def _blank_comments(text: str) -> str:
+    """Kommentare durch Leerzeichen ersetzen; Offsets und Zeilen bleiben erhalten."""
+    return _COMMENT.sub(lambda m: re.sub(r"[^\n]", " ", m.group(0)), text)
+
+
+class CSSAnalyzer(BaseAnalyzer):
+
+    # ------------------------------------------------ Tabelle ------
+    def analyse(self, rel_path: str, text: str) -> List[Dict]:
+        return [
+            {
+                "file":   rel_path,
+                "func":   sel,
+                "route":  "",
+                "class":  ctx,
+                "lineno": lineno,
+            }
+            for sel, ctx, lineno in self._rules(text)
+        ]
+
+    # ------------------------------------------------ Baum ---------
+    def analyse_tree(self, rel_path: str, text: str) -> Dict:
+        functions = {
+            sel: {"route": "", "calls": [], "out_calls": []}
+            for sel, _, _ in self._rules(text)
+        }
+        return {
+            "functions": functions,
+            "imports":   self._collect_imports(text),
+            "aliases":   {},
+            "nested":    {},
+        }
+
+    # -------------------------------- Hilfs-Methoden --------------
+    def _rules(self, text: str):
+        """
+        Einmaliger Durchlauf über '{', '}' und ';'. Liefert
+        (selektor, at-regel-kontext, zeile) für jeden Regelblock.
+        """
+        code = _blank_comments(text)
+        line_starts = [0] + [m.end() for m in re.finditer("\n", code)]
+
+        stack: List[str] = []
+        last = 0
+        for m in _TOKEN.finditer(code):
+            tok = m.group(0)
+            if tok == "{":
+                head = code[last:m.start()].strip()
+                start = last + (len(code[last:m.start()]) - len(code[last:m.start()].lstrip()))
+                if head.startswith("@"):
+                    stack.append(" ".join(head.split()))
+                else:
+                    stack.append("")
+                    if head and not any(ctx.startswith(("@keyframes", "@font-face")) for ctx in stack):
+                        ctx = next((c for c in reversed(stack) if c), "")
+                        yield " ".join(head.split()), ctx, bisect_right(line_starts, start)
+            elif tok == "}" and stack:
+                stack.pop()
+            last = m.end()
+
+    def _collect_imports(self, text: str) -> List[Dict]:
+        code = _blank_comments(text)
+        imps = []
+        for m in _IMPORT.finditer(code):
+            imps.append({
+                "type":   "import",
+                "module": m.group(2),
+                "name":   None,
+                "alias":  None,
+                "lineno": code.count("\n", 0, m.start()) + 1,
+            })
+        return imps
@@ -0,0 +1,406 @@
+# app/analyzers/javascript.py
+"""
+Regex-basierter Analyzer für JavaScript/TypeScript (.js, .jsx, .mjs, .cjs,
+.ts, .tsx, ...). Kein vollständiger Parser: Kommentare und String-Inhalte
+werden ausgeblendet, danach werden Funktionen, Klassen, Imports und
+Express-Routen über Muster + Klammer-Matching erkannt.
+
+Liefert dieselben Formen wie PythonAnalyzer (analyse / analyse_tree).
+"""
+from __future__ import annotations
+import re
+import threading
+from bisect import bisect_right
+from collections import defaultdict, OrderedDict
+from typing import List, Dict, Optional, Tuple
+
+from app.analyzer import BaseAnalyzer
+
+_IDENT = r"[A-Za-z_$][\w$]*"
+
+_KEYWORDS = {
+    "if", "for", "while", "switch", "catch", "return", "function", "typeof",
+    "new", "await", "yield", "do", "else", "try", "with", "delete", "void",
+    "in", "of", "instanceof", "throw", "case", "import", "export", "super",
+    "class", "extends", "var", "let", "const", "async", "static", "get", "set",
+}
+
+_FUNC_DECL = re.compile(rf"\b(?:async\s+)?function\s*\*?\s*({_IDENT})\s*(?:<[^>]*>)?\s*\(")
+_VAR_FUNC  = re.compile(
+    rf"\b(?:const|let|var)\s+({_IDENT})\s*(?::[^=;]+)?=\s*(?:async\s+)?"
+    rf"(?:function\s*\*?\s*(?:{_IDENT})?\s*\(|(?:<[^>]*>\s*)?\(|({_IDENT})\s*=>)"
+)
+_METHOD    = re.compile(
+    rf"^[ \t]*(?:(?:public|private|protected|static|async|readonly|override|abstract|get|set)\s+)*"
+    rf"\*?\s*({_IDENT})\s*(?:<[^>]*>)?\s*\(",
+    re.MULTILINE,
+)
+_FIELD_ARROW = re.compile(
+    rf"^[ \t]*(?:(?:public|private|protected|static|readonly)\s+)*({_IDENT})\s*(?::[^=;]+)?="
+    rf"\s*(?:async\s+)?(?:\(|({_IDENT})\s*=>)",
+    re.MULTILINE,
+)
+_CLASS     = re.compile(rf"\bclass\s+({_IDENT})[^{{;]*\{{")
+_CALL      = re.compile(rf"({_IDENT})\s*(?:<[^>()]*>)?\s*\(")
+_AFTER_PARAMS_BODY  = re.compile(r"\s*(?::\s*[^{;=]+?)?\s*\{")
+_AFTER_PARAMS_ARROW = re.compile(r"\s*(?::\s*[^=;{]+?)?\s*=>\s*")
+
+_IMPORT_FROM = re.compile(r"\bimport\s+(type\s+)?([^;]*?)\s+from\s+(['\"])")
+_IMPORT_BARE = re.compile(r"\bimport\s+(['\"])")
+_EXPORT_FROM = re.compile(r"\bexport\s+(?:type\s+)?(\*(?:\s+as\s+" + _IDENT + r")?|\{[^}]*\})\s+from\s+(['\"])")
+_REQUIRE     = re.compile(rf"\b(?:const|let|var)\s+({_IDENT}|\{{[^}}]*\}})\s*=\s*require\s*\(\s*(['\"])")
+_ROUTE       = re.compile(
+    rf"\b(?:app|router|server|api|{_IDENT}Router)\.(get|post|put|delete|patch|all)\s*\(\s*(['\"`])"
+)
+
+# Zuletzt geparste Texte: analyse_tree, analyse und analyse_aliases laufen
+# je Datei direkt nacheinander und teilen sich so einen Parse
+PARSE_CACHE_SIZE = 8
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Vorverarbeitung
+# ════════════════════════════════════════════════════════════════════
+def _blank(text: str) -> str:
+    """
+    Ersetzt Kommentare komplett und String-Inhalte (ohne Quotes) durch
+    Leerzeichen. Zeilenumbrüche und Offsets bleiben erhalten.
+    """
+    out = list(text)
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        nxt = text[i + 1] if i + 1 < n else ""
+        if c == "/" and nxt == "/":
+            j = text.find("\n", i)
+            j = n if j < 0 else j
+            for k in range(i, j):
+                out[k] = " "
+            i = j
+        elif c == "/" and nxt == "*":
+            j = text.find("*/", i + 2)
+            j = n if j < 0 else j + 2
+            for k in range(i, j):
+                if text[k] != "\n":
+                    out[k] = " "
+            i = j
+        elif c in "'\"`":
+            j = i + 1
+            while j < n and text[j] != c:
+                if text[j] == "\\":
+                    j += 1
+                elif text[j] == "\n" and c != "`":
+                    break
+                j += 1
+            for k in range(i + 1, min(j, n)):
+                if text[k] != "\n":
+                    out[k] = " "
+            i = j + 1
+        else:
+            i += 1
+    return "".join(out)
+
+
+def _match(code: str, i: int, open_ch: str, close_ch: str) -> int:
+    """Index der schließenden Klammer zu code[i] == open_ch (oder len(code))."""
+    depth = 0
+    for j in range(i, len(code)):
+        ch = code[j]
+        if ch == open_ch:
+            depth += 1
+        elif ch == close_ch:
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(code)
+
+
+def _expr_end(code: str, i: int) -> int:
+    """Ende eines Arrow-Ausdrucks ohne Block: bis ';', ',' oder Zeilenende auf Tiefe 0."""
+    depth = 0
+    for j in range(i, len(code)):
+        ch = code[j]
+        if ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            if depth == 0:
+                return j
+            depth -= 1
+        elif depth == 0 and ch in ";,\n":
+            return j
+    return len(code)
+
+
+def _string_at(text: str, quote_pos: int) -> str:
+    """Liest den String-Literal ab der öffnenden Quote im Originaltext."""
+    q = text[quote_pos]
+    end = text.find(q, quote_pos + 1)
+    return text[quote_pos + 1:end] if end > 0 else ""
+
+
+def _innermost(spans: List[Tuple[int, int, object]], points: List[int]) -> List[object]:
+    """
+    Für aufsteigende `points` je das innerste Intervall (spätester Start)
+    mit start < p < end, sonst None. `spans` nach Start sortiert; ein
+    gemeinsamer Durchlauf mit Stapel statt Suche je Punkt.
+    """
+    out: List[object] = []
+    stack: List[Tuple[int, int, object]] = []
+    i = 0
+    for p in points:
+        while i < len(spans) and spans[i][0] < p:
+            stack.append(spans[i])
+            i += 1
+        # beendete Intervalle sind auch für alle späteren Punkte vorbei
+        while stack and stack[-1][1] <= p:
+            stack.pop()
+        out.append(stack[-1][2] if stack else None)
+    return out
+
+
+class JavaScriptAnalyzer(BaseAnalyzer):
+    """
+    Funktionen (Deklarationen, Arrow-Funktionen, Methoden), Klassen,
+    ES-/CommonJS-Imports und Express-Routen (app.get('/x', handler)).
+    """
+
+    # ------------------------------------------------ Tabelle ------
+    def analyse(self, rel_path: str, text: str) -> List[Dict]:
+        parsed = self._parse(text)
+        return [
+            {
+                "file":   rel_path,
+                "func":   f["name"],
+                "route":  f["route"],
+                "class":  f["class"],
+                "lineno": f["lineno"],
+            }
+            for f in parsed["functions"]
+        ]
+
+    # ------------------------------------------------ Baum ---------
+    def analyse_tree(self, rel_path: str, text: str) -> Dict:
+        parsed = self._parse(text)
+        functions: Dict[str, Dict] = {}
+        for f in parsed["functions"]:
+            functions[f["name"]] = {
+                "route":     f["route"],
+                "calls":     f["calls"],
+                "out_calls": [],
+            }
+
+        aliases: Dict[str, str] = {}
+        for imp in parsed["imports"]:
+            local = imp["alias"] or imp["name"]
+            if local and local != "*":
+                aliases[local] = f"{imp['module']}.{imp['name']}" if imp["name"] else imp["module"]
+
+        return {
+            "functions": functions,
+            "imports":   parsed["imports"],
+            "aliases":   aliases,
+            "nested":    parsed["nested"],
+        }
+
+    # ------------------------------------------------ Alias-Analyse -
+    def analyse_aliases(self, rel_path: str, text: str) -> List[Dict]:
+        return [
+            {
+                "file":   rel_path,
+                "lineno": imp["lineno"],
+                "module": imp["module"],
+                "name":   imp["name"],
+                "alias":  imp["alias"],
+            }
+            for imp in self._parse(text)["imports"]
+            if imp["type"] == "from" and imp["alias"] and imp["name"] not in ("default", "*")
+        ]
+
+    # -------------------------------- Parser ----------------------
+    def __init__(self):
+        super().__init__()
+        self._parsed: "OrderedDict[str, Dict]" = OrderedDict()
+        self._parsed_lock = threading.Lock()
+
+    def _parse(self, text: str) -> Dict:
+        """Geteiltes Ergebnis je Text (nicht verändern)."""
+        with self._parsed_lock:
+            parsed = self._parsed.get(text)
+            if parsed is not None:
+                self._parsed.move_to_end(text)
+                return parsed
+        parsed = self._parse_text(text)
+        with self._parsed_lock:
+            self._parsed[text] = parsed
+            while len(self._parsed) > PARSE_CACHE_SIZE:
+                self._parsed.popitem(last=False)
+        return parsed
+
+    def _parse_text(self, text: str) -> Dict:
+        code = _blank(text)
+        line_starts = [0] + [m.end() for m in re.finditer("\n", code)]
+
+        def lineno(pos: int) -> int:
+            return bisect_right(line_starts, pos)
+
+        funcs = self._find_functions(code)
+        self._find_routes(code, text, funcs)
+
+        classes = sorted(
+            ((m.end() - 1, _match(code, m.end() - 1, "{", "}"), m.group(1))
+             for m in _CLASS.finditer(code)),
+            key=lambda c: c[0],
+        )
+
+        # umschließende Funktion/Klasse je Funktion in einem sortierten Durchlauf
+        funcs.sort(key=lambda f: f["pos"])
+        points = [f["pos"] for f in funcs]
+        bodies = sorted(((f["body"][0], f["body"][1], f) for f in funcs), key=lambda b: b[0])
+        parents = _innermost(bodies, points)
+        class_names = _innermost(classes, points)
+
+        nested: Dict[str, List[str]] = defaultdict(list)
+        for f, parent, cls in zip(funcs, parents, class_names):
+            if parent is not None and parent is not f and parent["name"] != f["name"]:
+                nested[parent["name"]].append(f["name"])
+            f["class"] = cls or ""
+            f["lineno"] = lineno(f["pos"])
+
+            b0, b1 = f["body"]
+            called = {
+                cm.group(1) for cm in _CALL.finditer(code, b0, b1)
+                if cm.group(1) not in _KEYWORDS
+            }
+            f["calls"] = sorted(called)
+
+        return {
+            "functions": funcs,
+            "imports":   self._collect_imports(code, text, lineno),
+            "nested":    dict(nested),
+        }
+
+    def _find_functions(self, code: str) -> List[Dict]:
+        found: Dict[int, Dict] = {}
+
+        def add(name: str, pos: int, body: Optional[Tuple[int, int]]):
+            if body is None or name in _KEYWORDS or pos in found:
+                return
+            found[pos] = {"name": name, "pos": pos, "body": body, "route": ""}
+
+        def body_after_params(paren: int, arrow_ok: bool, block_ok: bool):
+            close = _match(code, paren, "(", ")")
+            if block_ok:
+                m = _AFTER_PARAMS_BODY.match(code, close + 1)
+                if m:
+                    start = m.end() - 1
+                    return start, _match(code, start, "{", "}")
+            if arrow_ok:
+                m = _AFTER_PARAMS_ARROW.match(code, close + 1)
+                if m:
+                    return arrow_body(m.end())
+            return None
+
+        def arrow_body(i: int):
+            if i < len(code) and code[i] == "{":
+                return i, _match(code, i, "{", "}")
+            return i, _expr_end(code, i)
+
+        for m in _FUNC_DECL.finditer(code):
+            add(m.group(1), m.start(1), body_after_params(m.end() - 1, False, True))
+
+        for rx in (_VAR_FUNC, _FIELD_ARROW):
+            for m in rx.finditer(code):
+                if m.group(2):                       # x => ...
+                    i = code.find("=>", m.end(2)) + 2
+                    while i < len(code) and code[i].isspace():
+                        i += 1
+                    add(m.group(1), m.start(1), arrow_body(i))
+                elif code[m.end() - 1] == "(":
+                    is_fn = "function" in code[m.start():m.end()]
+                    add(m.group(1), m.start(1), body_after_params(m.end() - 1, not is_fn, is_fn))
+
+        for m in _METHOD.finditer(code):
+            add(m.group(1), m.start(1), body_after_params(m.end() - 1, False, True))
+
+        return list(found.values())
+
+    def _find_routes(self, code: str, text: str, funcs: List[Dict]) -> None:
+        by_name = {f["name"]: f for f in funcs}
+        for m in _ROUTE.finditer(code):
+            path = _string_at(text, m.start(2))
+            call_open = code.rfind("(", m.start(), m.start(2) + 1)
+            call_close = _match(code, call_open, "(", ")")
+            args = code[m.end(2):call_close]
+            last = args.rsplit(",", 1)[-1].strip()
+            if re.fullmatch(_IDENT, last) and last in by_name:
+                by_name[last]["route"] = path
+            elif len(args.split(",")) > 1:
+                # Inline-Handler → eigener Eintrag "<METHOD> <pfad>"
+                name = f"{m.group(1).upper()} {path}"
+                funcs.append({
+                    "name":  name,
+                    "pos":   m.start(),
+                    "body":  (m.end(2), call_close),
+                    "route": path,
+                })
+
+    def _collect_imports(self, code: str, text: str, lineno) -> List[Dict]:
+        imps: List[Dict] = []
+
+        def add(type_: str, module: str, name, alias, pos: int):
+            imps.append({
+                "type":   type_,
+                "module": module,
+                "name":   name,
+                "alias":  alias,
+                "lineno": lineno(pos),
+            })
+
+        def named(spec: str, module: str, pos: int, sep: str):
+            for part in spec.strip("{} \n").split(","):
+                part = part.strip()
+                if part.startswith("type "):
+                    part = part[5:].strip()
+                if not part:
+                    continue
+                if sep in part:
+                    name, alias = (p.strip() for p in part.split(sep, 1))
+                else:
+                    name, alias = part, None
+                add("from", module, name, alias, pos)
+
+        for m in _IMPORT_FROM.finditer(code):
+            module = _string_at(text, m.end() - 1)
+            clause = m.group(2).strip()
+            default, _, rest = clause.partition(",")
+            if default.strip().startswith(("{", "*")):
+                default, rest = "", clause
+            if default.strip():
+                add("from", module, "default", default.strip(), m.start())
+            rest = rest.strip()
+            if rest.startswith("*"):
+                add("import", module, None, rest.split("as", 1)[-1].strip(), m.start())
+            elif rest.startswith("{"):
+                named(rest, module, m.start(), " as ")
+
+        for m in _IMPORT_BARE.finditer(code):
+            add("import", _string_at(text, m.start(1)), None, None, m.start())
+
+        for m in _EXPORT_FROM.finditer(code):
+            module = _string_at(text, m.end() - 1)
+            spec = m.group(1)
+            if spec.startswith("{"):
+                named(spec, module, m.start(), " as ")
+            else:
+                add("import", module, None, spec.split("as", 1)[-1].strip() if "as" in spec else None, m.start())
+
+        for m in _REQUIRE.finditer(code):
+            module = _string_at(text, m.end() - 1)
+            target = m.group(1)
+            if target.startswith("{"):
+                named(target, module, m.start(), ":")
+            else:
+                add("import", module, None, target, m.start())
+
+        imps.sort(key=lambda r: r["lineno"])
+        return imps
@@ -0,0 +1,125 @@
+# app/compression.py
+"""
+Antwort-Kompression für den Blueprint (after_request-Hook).
+
+Verfahren nach Accept-Encoding: br (falls `brotli` installiert),
+zstd (falls `zstandard` installiert), sonst gzip. Gestreamte Antworten
+und send_file-Antworten werden Chunk für Chunk komprimiert, ohne den
+Body vorher komplett in den Speicher zu holen.
+"""
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from flask import current_app, request
+
+try:  # optional
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:  # optional
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+_COMPRESSIBLE = (
+    "text/", "application/json", "application/javascript",
+    "application/xml", "image/svg+xml",
+)
+
+# encoding -> Fabrik für (compress(chunk), flush())
+_Codec = Callable[[], Tuple[Callable[[bytes], bytes], Callable[[], bytes]]]
+
+
+def _gzip() -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    obj = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return obj.compress, obj.flush
+
+
+def _brotli():
+    obj = brotli.Compressor(quality=5)
+    return obj.process, obj.finish
+
+
+def _zstd():
+    obj = zstandard.ZstdCompressor(level=3).compressobj()
+    return obj.compress, obj.flush
+
+
+def available_codecs() -> Dict[str, _Codec]:
+    """In Präferenz-Reihenfolge."""
+    codecs: Dict[str, _Codec] = {}
+    if brotli is not None:
+        codecs["br"] = _brotli
+    if zstandard is not None:
+        codecs["zstd"] = _zstd
+    codecs["gzip"] = _gzip
+    return codecs
+
+
+def _stream(chunks: Iterable, codec: _Codec) -> Iterator[bytes]:
+    compress, flush = codec()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            out = compress(chunk)
+            if out:
+                yield out
+        yield flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def compress_response(response):
+    """after_request-Hook: komprimiert Text-Antworten passend zu Accept-Encoding."""
+    if not (200 <= response.status_code < 300) or response.status_code == 204:
+        return response
+    if "Content-Encoding" in response.headers:
+        return response
+    if not (response.mimetype or "").startswith(_COMPRESSIBLE):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    codecs = available_codecs()
+    encoding = request.accept_encodings.best_match(list(codecs))
+    if not encoding:
+        return response
+
+    streamed = response.is_streamed or response.direct_passthrough
+    if not streamed:
+        data = response.get_data()
+        if len(data) < current_app.config.get("COMPRESS_MIN_SIZE", 1024):
+            return response
+        compress, flush = codecs[encoding]()
+        response.set_data(compress(data) + flush())
+    else:
+        response.direct_passthrough = False
+        response.response = _stream(response.response, codecs[encoding])
+        response.headers.pop("Content-Length", None)
+
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        # eigene Repräsentation → eigenes ETag (siehe matching_etag)
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+
+def matching_etag(etag: str) -> Optional[str]:
+    """
+    Das in If-None-Match genannte ETag der Ressource (identisch oder
+    kodierte Variante "<etag>-<kodierung>"), sonst None. Ein 304 muss genau
+    dieses ETag zurückgeben; der Inhalt hinter einem ETag ist unveränderlich.
+    """
+    inm = request.if_none_match
+    if not inm:
+        return None
+    if inm.star_tag or inm.contains(etag):
+        return etag
+    for enc in ("br", "zstd", "gzip"):
+        if inm.contains(f"{etag}-{enc}"):
+            return f"{etag}-{enc}"
+    return None
@@ -1,16 +1,26 @@
 # app/routes.py
 from __future__ import annotations
+import json
+import re
+import time
 from flask import (
     Blueprint, render_template, redirect, url_for,
-    session, request
+    session, request, current_app, jsonify, abort, send_file,
+    Response, stream_with_context
 )
 from app.forms import ProjectForm
 
 # Import Services & Utils
-from app import utils
-from app.services import settings_service, repo_service, uml_service
+from app import compression
+from app.services import (
+    settings_service, repo_service, uml_service, index_service, artifact_service,
+    export_service, prefetch_service, selection_service, pipeline_service,
+)
 
 bp = Blueprint("main", __name__)
+bp.after_request(compression.compress_response)
+bp.before_request(prefetch_service.request_started)
+bp.teardown_request(prefetch_service.request_finished)
 
 # ════════════════════════════════════════════════════════════════════════
 # 1) Start- und Projektauswahl
@@ -51,15 +61,92 @@ def select_files():
 
     repo_url  = settings["projects"].get(project_key)
     
-    # Aufruf an Service
-    file_list = repo_service.get_flat_file_list(repo_url, token)
+    # Aufruf an Service: Dateiliste + Kennzahlen (Bytes, Zeilen, Tokens, ...)
+    stats = repo_service.get_stats(repo_url, token)
+    file_stats = stats.snapshot() if stats else {}
 
     flat_list = [
-        {"filename": p, "indent": p.count("/") - 1}
-        for p in file_list
+        {"filename": p, "indent": p.count("/") - 1, "stats": s}
+        for p, s in file_stats.items()
     ]
     return render_template("select_files.html",
-                           flat_list=flat_list, project=project_key)
+                           flat_list=flat_list, project=project_key,
+                           dir_stats=stats.directories() if stats else {},
+                           totals=stats.totals(file_stats) if stats else {},
+                           max_file_bytes=repo_service.MAX_FILE_BYTES,
+                           selection_sets=selection_service.list_sets(project_key))
+
+# ════════════════════════════════════════════════════════════════════════
+# 2a) Auswahl-Sets (Präfix-Regeln statt einzelner Pfade im POST)
+# ════════════════════════════════════════════════════════════════════════
+@bp.route("/selections", methods=["GET", "POST"])
+def selections():
+    project_key = session.get("project")
+    if not project_key:
+        abort(403)
+    if request.method == "GET":
+        return jsonify(selection_service.list_sets(project_key))
+
+    data  = request.get_json(silent=True) or {}
+    rules = data.get("rules")
+    if not isinstance(rules, list) or not all(isinstance(r, str) and r[:1] in ("+", "-") for r in rules):
+        return jsonify({"error": "Ungültige Regeln."}), 400
+    sel_id = selection_service.save(
+        project_key, selection_service.Selection(rules), str(data.get("name", "")).strip())
+    return jsonify({"id": sel_id})
+
+@bp.route("/selections/<sel_id>", methods=["DELETE"])
+def delete_selection(sel_id):
+    project_key = session.get("project")
+    if not project_key:
+        abort(403)
+    selection_service.delete(project_key, sel_id)
+    return jsonify({"deleted": sel_id})
+
+def _form_selection(project_key: str, repo_url: str, token: str):
+    """
+    Auswahl aus dem Formular: selection_id (gespeichertes Set) oder, ohne
+    JavaScript, die einzelnen selected_paths (werden zum Set verdichtet).
+    Liefert (auswahl, id).
+    """
+    sel_id = request.form.get("selection_id")
+    if sel_id:
+        selection = selection_service.load(project_key, sel_id)
+        if selection is None:
+            abort(404, description="Unbekannte Auswahl.")
+        return selection, sel_id
+    selection = selection_service.compress(
+        repo_service.get_flat_file_list(repo_url, token), request.form.getlist("selected_paths"))
+    return selection, selection.id
+
+# ════════════════════════════════════════════════════════════════════════
+# 2b) Inhaltssuche (Trigramm-Index) → Vorauswahl im Dateipicker
+# ════════════════════════════════════════════════════════════════════════
+@bp.route("/search")
+def search():
+    settings    = settings_service.read_settings()
+    token       = settings.get("token", "")
+    project_key = session.get("project")
+    if not token or not project_key:
+        abort(403)
+
+    query = request.args.get("q", "")
+    if len(query) < 2:
+        return jsonify({"results": [], "error": "Suchbegriff zu kurz."})
+
+    index = repo_service.get_search_index(settings["projects"].get(project_key), token)
+    if index is None:
+        return jsonify({"results": [], "error": "Archiv konnte nicht geladen werden."}), 502
+
+    try:
+        results, truncated = index.search(
+            query,
+            regex=request.args.get("regex") == "1",
+            ignore_case=request.args.get("case") != "1",
+        )
+    except re.error as exc:
+        return jsonify({"results": [], "error": f"Ungültiger Regex: {exc}"}), 400
+    return jsonify({"results": results, "truncated": truncated})
 
 # ════════════════════════════════════════════════════════════════════════
 # 3) Gesamtausgabe / Analyse / UML
@@ -72,14 +159,16 @@ def full_output():
     if not token or not project_key:
         return redirect(url_for("main.project"))
 
-    selected_paths = request.form.getlist("selected_paths")
     repo_url       = settings["projects"].get(project_key)
+    selected_paths, selection_id = _form_selection(project_key, repo_url, token)
+    dedupe_handover = bool(request.form.get("dedupe_handover"))
 
     try:
         # Service Aufruf (FIX: Jetzt mit handover_clean_md als 4. Rückgabewert)
         (structure_str, content_str, handover_md, handover_clean_md, analysis_rows, code_tree, 
-         alias_warnings, import_conflicts) = repo_service.get_zip_full_output(
-            repo_url, token, selected_paths, analyse=True
+         alias_warnings, import_conflicts, commit, module_graph) = repo_service.get_zip_full_output(
+            repo_url, token, selected_paths, analyse=True, project_key=project_key,
+            dedupe_handover=dedupe_handover,
         )
     except Exception as exc:
         print("[gitload] Analyse-Fehler:", exc)
@@ -89,64 +178,263 @@ def full_output():
         return render_template("full_output.html", error="Fehler beim Laden.")
 
     # ── Daten für View aufbereiten ────────────────────────────────────────
-
-    # Imports Tabelle vorbereiten
-    imports_rows = [
-        {"file": rel, **imp}
-        for rel, info in code_tree.items()
-        for imp in info.get("imports", [])
-    ]
-    imports_rows.sort(key=lambda r: (r["file"], r["lineno"]))
-    
-    imports_copy = ""
-    if imports_rows:
-        headers = ["file","lineno","type","module","name","alias"]
-        lines = ["\t".join(headers)]
-        for r in imports_rows:
-            lines.append("\t".join(str(r.get(c, "")) for c in headers))
-        imports_copy = "\n".join(lines)
-
-    # Funktionen Markdown Tabelle
-    if analysis_rows:
-        known     = ["file", "func", "route", "class", "lineno"]
-        col_order = [c for c in known if c in analysis_rows[0]] or list(analysis_rows[0].keys())
-        md_head = "| " + " | ".join(col_order) + " |"
-        md_sep  = "| " + " | ".join(["---"] * len(col_order)) + " |"
-        md_body = ["| " + " | ".join(str(r.get(c, "")) for c in col_order) + " |" for r in analysis_rows]
-        analysis_markdown = "\n".join([md_head, md_sep, *md_body])
-    else:
-        col_order, analysis_markdown = [], ""
-
-    # Visualisierung (Tree) via Utils
-    code_tree_str = utils.format_directory_tree(code_tree)
-    
-    # UML Generierung via Service
-    uml_code = uml_service.build_package_uml(code_tree)
-
-    # Kombinierter Text für Tab 1
-    combined_text = (
-        "Struktur der ZIP-Datei:\n" + structure_str + "\n\n" +
-        "Einsicht in die Dateien:\n" + content_str
+    # Artefakt-Pipeline: nur benötigte Artefakte, Zwischenergebnisse einmal
+    limits = (current_app.config["UML_MAX_NODES"], current_app.config["UML_MAX_EDGES"])
+    artifact_key = artifact_service.artifact_key(commit, {
+        "selection": selection_id,
+        "dedupe":    dedupe_handover,
+        "uml":       list(limits),
+    })
+    # Nur auf Platte abgelegte Artefakte entfallen, wenn der Satz schon existiert
+    stored = artifact_service.path(project_key, artifact_key, "code_tree.json") is not None
+    disk_only = [] if stored else ["code_tree.json"]
+    out = pipeline_service.ARTIFACTS.run(
+        ["files.txt", "handover.md", "handover_clean.md", "functions.md", "col_order",
+         "imports_rows", "imports.tsv", "tree.txt", "reachability", "dead_code.tsv",
+         "module_rows", "module_cycles", "modules.tsv", "uml_index", *disk_only],
+        {
+            "structure_str": structure_str, "content_str": content_str,
+            "handover_md": handover_md, "handover_clean_md": handover_clean_md,
+            "analysis_rows": analysis_rows, "code_tree": code_tree,
+            "module_graph": module_graph,
+        },
     )
 
+    # Artefakte ablegen → eigene URLs mit starkem ETag (Commit + Optionen).
+    # UML-Diagramme entstehen erst beim Abruf (siehe artifact) aus dem
+    # geteilten Index; code_tree.json erlaubt das auch nach einem Neustart.
+    artifact_names = ("files.txt", "handover.md", "handover_clean.md", "functions.md",
+                      "imports.tsv", "tree.txt", "dead_code.tsv", "modules.tsv", "code_tree.json")
+    artifacts = {name: out[name] for name in artifact_names if name in out}
+    uml_service.remember_index((project_key, artifact_key), out["uml_index"])
+    uml_names = uml_service.artifact_names(out["uml_index"])
+    try:
+        artifact_service.store(project_key, artifact_key, artifacts)
+        artifact_urls = {
+            name: url_for("main.artifact", project_key=project_key, key=artifact_key, name=name)
+            for name in [*artifact_names, *uml_names]
+        }
+    except OSError as exc:
+        print("[gitload] Artefakte nicht gespeichert:", exc)
+        artifact_urls = {}
+    uml_urls = [(label, artifact_urls[name]) for name, label in uml_names.items()
+                if name in artifact_urls]
+
     return render_template(
         "full_output.html",
-        combined_text     = combined_text,
+        combined_text     = out["files.txt"],
         handover_md       = handover_md,
         handover_clean_md = handover_clean_md, # <--- NEU übergeben
         analysis_rows     = analysis_rows,
-        analysis_markdown = analysis_markdown,
-        col_order         = col_order,
-        imports_rows      = imports_rows,
-        imports_copy      = imports_copy,
-        code_tree_str     = code_tree_str,
-        uml_code          = uml_code,
+        analysis_markdown = out["functions.md"],
+        col_order         = out["col_order"],
+        imports_rows      = out["imports_rows"],
+        imports_copy      = out["imports.tsv"],
+        code_tree_str     = out["tree.txt"],
+        uml_urls          = uml_urls,
         alias_warnings    = alias_warnings,
         import_conflicts  = import_conflicts,
+        reachability      = out["reachability"],
+        dead_code_copy    = out["dead_code.tsv"],
+        module_rows       = out["module_rows"],
+        module_cycles     = out["module_cycles"],
+        modules_copy      = out["modules.tsv"],
+        artifact_urls     = artifact_urls,
+    )
+
+# ════════════════════════════════════════════════════════════════════════
+# 3a) Bundle-Export (ZIP / tar.gz), Einträge werden beim Streamen erzeugt
+# ════════════════════════════════════════════════════════════════════════
+@bp.route("/export", methods=["POST"])
+def export_bundle():
+    settings    = settings_service.read_settings()
+    token       = settings.get("token", "")
+    project_key = session.get("project")
+    if not token or not project_key:
+        return redirect(url_for("main.project"))
+
+    fmt = request.form.get("format", "zip")
+    if fmt not in export_service.FORMATS:
+        abort(400, description="Unbekanntes Format.")
+
+    repo_url        = settings["projects"].get(project_key)
+    selected_paths, _ = _form_selection(project_key, repo_url, token)
+    dedupe_handover = bool(request.form.get("dedupe_handover"))
+    try:
+        # Handover-Texte erst beim Schreiben des jeweiligen Eintrags erzeugen
+        (structure_str, _, handover_md, handover_clean_md, analysis_rows, code_tree,
+         _, _, commit, module_graph) = repo_service.get_zip_full_output(
+            repo_url, token, selected_paths, analyse=True, project_key=project_key,
+            dedupe_handover=dedupe_handover, lazy_texts=True,
+        )
+    except Exception as exc:
+        print("[gitload] Analyse-Fehler:", exc)
+        abort(502, description=f"Analyse-Fehler: {exc}")
+    if structure_str is None:
+        abort(502, description="Archiv konnte nicht geladen werden.")
+
+    max_nodes = current_app.config["UML_MAX_NODES"]
+    max_edges = current_app.config["UML_MAX_EDGES"]
+    # Gemeinsame Zwischenergebnisse (uml_index, imports_rows) bleiben in values,
+    # fertige Artefakte werden nach dem Schreiben wieder freigegeben
+    values = {
+        "structure_str": structure_str,
+        "analysis_rows": analysis_rows, "code_tree": code_tree,
+        "module_graph": module_graph,
+    }
+
+    def produce(name):
+        return lambda: pipeline_service.ARTIFACTS.run([name], values).pop(name)
+
+    def entries():
+        yield "handover.md", handover_md
+        yield "handover_clean.md", handover_clean_md
+        for name in ("functions.csv", "functions.md", "imports.tsv", "tree.txt", "modules.tsv"):
+            yield name, produce(name)
+        yield "uml/full.puml", produce("uml.puml")
+        index = pipeline_service.ARTIFACTS.run(["uml_index"], values)["uml_index"]
+        yield "uml/overview.puml", lambda: uml_service.build_overview_uml(index, max_nodes, max_edges)
+        for part in uml_service.list_partitions(index):
+            yield f"uml/{part}.puml", lambda part=part: uml_service.build_partition_uml(
+                index, part, max_nodes, max_edges)
+        yield "code_tree.json", produce("code_tree.json")
+
+    mimetype, ext = export_service.FORMATS[fmt]
+    root = f"{project_key}-{(commit or 'export')[:12]}"
+    return Response(
+        stream_with_context(export_service.stream_bundle(entries(), fmt, root)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{root}{ext}"'},
+    )
+
+# ════════════════════════════════════════════════════════════════════════
+# 3b) Einzelne Artefakte (cachebar über ETag, komprimiert via after_request)
+# ════════════════════════════════════════════════════════════════════════
+@bp.route("/artifact/<project_key>/<key>/<name>")
+def artifact(project_key, key, name):
+    _check_project(project_key)
+    tag = artifact_service.etag(key, name)
+    matched = compression.matching_etag(tag)
+    if matched:
+        resp = current_app.response_class(status=304)
+        resp.set_etag(matched)
+        resp.vary.add("Accept-Encoding")
+        return resp
+
+    path = artifact_service.path(project_key, key, name)
+    if path is None and name.endswith(".puml"):
+        path = _render_uml_artifact(project_key, key, name)
+    if path is None:
+        abort(404, description="Artefakt nicht (mehr) vorhanden.")
+
+    resp = send_file(path, mimetype=artifact_service.content_type(name),
+                     conditional=False, etag=False, max_age=3600)
+    resp.set_etag(tag)
+    resp.cache_control.public = False
+    resp.cache_control.private = True
+    return resp
+
+def _render_uml_artifact(project_key: str, key: str, name: str):
+    """UML-Diagramm beim ersten Abruf aus dem (geteilten) Index erzeugen und ablegen."""
+    def load():
+        source = artifact_service.path(project_key, key, "code_tree.json")
+        if source is None:
+            return None
+        with open(source, encoding="utf-8") as f:
+            return uml_service.index_code_tree(json.load(f))
+
+    index = uml_service.cached_index((project_key, key), load)
+    if index is None:
+        return None
+    text = uml_service.render_artifact(index, name, current_app.config["UML_MAX_NODES"],
+                                       current_app.config["UML_MAX_EDGES"])
+    if text is None:
+        return None
+    try:
+        return artifact_service.store_one(project_key, key, name, text)
+    except OSError as exc:
+        print("[gitload] Artefakt nicht gespeichert:", exc)
+        return None
+
+# ════════════════════════════════════════════════════════════════════════
+# 4) Index-Abfragen (SQLite, ohne erneute Analyse)
+#    /api/<projekt>/<commit|latest>/...
+# ════════════════════════════════════════════════════════════════════════
+def _index_result(rows):
+    if rows is None:
+        abort(404, description="Kein Index für dieses Projekt/Commit (wird ggf. noch erstellt).")
+    return jsonify(rows)
+
+def _check_project(project_key: str) -> None:
+    if project_key not in settings_service.read_settings().get("projects", {}):
+        abort(404, description="Unbekanntes Projekt.")
+
+@bp.route("/api/<project_key>/commits")
+def api_commits(project_key):
+    _check_project(project_key)
+    return jsonify(index_service.list_commits(project_key))
+
+@bp.route("/api/<project_key>/<commit>/callers")
+def api_callers(project_key, commit):
+    _check_project(project_key)
+    func = request.args.get("func") or abort(400, description="Parameter 'func' fehlt.")
+    return _index_result(index_service.callers(
+        project_key, commit, func, request.args.get("file")))
+
+@bp.route("/api/<project_key>/<commit>/callees")
+def api_callees(project_key, commit):
+    _check_project(project_key)
+    func = request.args.get("func") or abort(400, description="Parameter 'func' fehlt.")
+    return _index_result(index_service.callees(
+        project_key, commit, func, request.args.get("file")))
+
+@bp.route("/api/<project_key>/<commit>/reachable")
+def api_reachable(project_key, commit):
+    _check_project(project_key)
+    func = request.args.get("func") or abort(400, description="Parameter 'func' fehlt.")
+    return _index_result(index_service.reachable(
+        project_key, commit, func, request.args.get("file")))
+
+@bp.route("/api/<project_key>/<commit>/routes")
+def api_routes(project_key, commit):
+    _check_project(project_key)
+    return _index_result(index_service.routes(project_key, commit))
+
+@bp.route("/api/<project_key>/<commit>/imports")
+def api_imports(project_key, commit):
+    _check_project(project_key)
+    return _index_result(index_service.imports(
+        project_key, commit,
+        module=request.args.get("module"), name=request.args.get("name")))
+
+# ════════════════════════════════════════════════════════════════════════
+# 5) Prefetch-Status
+# ════════════════════════════════════════════════════════════════════════
+@bp.route("/prefetch")
+def prefetch_status():
+    settings = settings_service.read_settings()
+    status   = prefetch_service.status()
+    rows = []
+    for key in sorted(settings.get("projects", {})):
+        st = status.get(key, {})
+        rows.append({
+            "project":  key,
+            "last_run": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(st["last_run"]))
+                        if st.get("last_run") else "",
+            "duration": st.get("duration", ""),
+            "commit":   st.get("commit", ""),
+            "changed":  st.get("changed"),
+            "running":  st.get("running", False),
+            "error":    st.get("error", ""),
+        })
+    return render_template(
+        "prefetch.html",
+        rows=rows,
+        interval=current_app.config.get("PREFETCH_INTERVAL", 0),
     )
 
 # ════════════════════════════════════════════════════════════════════════
-# 4) Einstellungen
+# 6) Einstellungen
 # ════════════════════════════════════════════════════════════════════════
 @bp.route("/settings", methods=["GET", "POST"])
 def settings_page():
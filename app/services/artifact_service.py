@@ -0,0 +1,116 @@
+"""
+Ablage der erzeugten Artefakte (Handover, Tabellen, Baum, UML) auf der
+Platte, damit sie über eigene URLs mit starkem ETag ausgeliefert werden
+können:
+
+    app/data/artifacts/<projekt>/<key>/<name>
+
+key = <commit>-<hash der Optionen + FORMAT_VERSION>. Der Inhalt hinter
+einem key ändert sich nie; neue Auswahl/Optionen ergeben einen neuen key.
+Ändert sich der Code, der Artefakte erzeugt (Formate, Analyzer), wird
+FORMAT_VERSION erhöht, damit alte ETags nicht mehr passen.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.services.settings_service import data_dir
+
+# Wie viele Artefakt-Sätze je Projekt aufbewahrt werden
+KEEP_PER_PROJECT = 20
+# Version der Artefakt-Erzeugung; Teil jedes keys (bei Formatänderungen erhöhen)
+FORMAT_VERSION = 2
+
+# Dateiendung → Content-Type
+CONTENT_TYPES = {
+    ".md":   "text/markdown; charset=utf-8",
+    ".tsv":  "text/tab-separated-values; charset=utf-8",
+    ".puml": "text/plain; charset=utf-8",
+    ".txt":  "text/plain; charset=utf-8",
+    ".json": "application/json",
+    ".csv":  "text/csv; charset=utf-8",
+}
+
+
+def _safe(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name) or "_"
+
+
+def _project_dir(project: str) -> Path:
+    return data_dir() / "artifacts" / _safe(project)
+
+
+def artifact_key(commit: str, options: Dict) -> str:
+    digest = hashlib.sha1(
+        json.dumps({"version": FORMAT_VERSION, **options}, sort_keys=True,
+                   default=str).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"{_safe(commit)}-{digest}"
+
+
+def etag(key: str, name: str) -> str:
+    return f"{key}-{_safe(name)}"
+
+
+def store(project: str, key: str, artifacts: Dict[str, str]) -> None:
+    """
+    Schreibt alle Artefakte eines Laufs, sofern der key noch nicht existiert
+    (gleicher key → gleicher Inhalt). Geschrieben wird in einen temporären
+    Ordner, der per rename an seinen Platz kommt; alte Sätze werden aufgeräumt.
+    """
+    target = _project_dir(project) / _safe(key)
+    if target.is_dir():
+        os.utime(target)    # zuletzt benutzt → beim Aufräumen behalten
+        return
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.mkdir(parents=True)
+    for name, text in artifacts.items():
+        (tmp / _safe(name)).write_text(text or "", encoding="utf-8")
+    try:
+        os.rename(tmp, target)
+    except OSError:
+        # parallel schon geschrieben
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not target.is_dir():
+            raise
+    _prune(project)
+
+
+def store_one(project: str, key: str, name: str, text: str) -> Path:
+    """Ergänzt ein nachträglich (auf Abruf) erzeugtes Artefakt."""
+    target = _project_dir(project) / _safe(key)
+    target.mkdir(parents=True, exist_ok=True)
+    tmp = target / f".{_safe(name)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, target / _safe(name))
+    return target / _safe(name)
+
+
+def path(project: str, key: str, name: str) -> Optional[Path]:
+    p = _project_dir(project) / _safe(key) / _safe(name)
+    return p if p.is_file() else None
+
+
+def list_names(project: str, key: str) -> List[str]:
+    d = _project_dir(project) / _safe(key)
+    return sorted(p.name for p in d.iterdir()) if d.is_dir() else []
+
+
+def content_type(name: str) -> str:
+    return CONTENT_TYPES.get(Path(name).suffix.lower(), "text/plain; charset=utf-8")
+
+
+def _prune(project: str) -> None:
+    sets = sorted(
+        (d for d in _project_dir(project).iterdir()
+         if d.is_dir() and not d.name.startswith(".")),
+        key=lambda d: d.stat().st_mtime,
+        reverse=True,
+    )
+    for old in sets[KEEP_PER_PROJECT:]:
+        shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,236 @@
+"""
+Aufrufgraph über alle analysierten Funktionen.
+
+Jede Funktion (Datei, Name) bekommt eine Integer-ID; Kanten liegen als
+CSR-Arrays vor (offsets[n+1], targets[m]), vorwärts und rückwärts.
+Mit NumPy (optional) laufen die BFS-Schritte frontier-weise vektorisiert,
+sonst über array/bytearray. Beides ist linear in Knoten + Kanten.
+
+Knoten sind nur Funktionen aufrufbarer Sprachen (CALLABLE_SUFFIXES); die
+"functions" anderer Analyzer (z.B. CSS-Selektoren) bleiben außen vor.
+Einstiegspunkte sind alle Funktionen mit Route (PythonAnalyzer._extract_route
+bzw. Express-Routen im JavaScriptAnalyzer). Die Erreichbarkeit aller Routen
+läuft als eine BFS mit allen Routen als Startmenge; je Route kommen eine
+Vorwärts-BFS (erreichte Funktionen) und eine Rückwärts-BFS (transitive
+Aufrufer) über denselben Graphen hinzu.
+"""
+from array import array
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:  # optional
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Endungen, deren "functions" echte Funktionen sind (Python, JS/TS)
+CALLABLE_SUFFIXES = (".py", ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts")
+
+
+def _callable_files(code_tree: Dict[str, dict]) -> Iterator[Tuple[str, dict]]:
+    return ((rel, meta) for rel, meta in code_tree.items()
+            if rel.lower().endswith(CALLABLE_SUFFIXES))
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Aufruf-Auflösung (auch von index_service genutzt)
+# ════════════════════════════════════════════════════════════════════
+def resolve_calls(code_tree: Dict[str, dict]
+                  ) -> Iterator[Tuple[str, str, str, Optional[str], Optional[str]]]:
+    """
+    Liefert (src_datei, src_funktion, aufgerufener_name, ziel_datei | None,
+    ziel_funktion | None). Reihenfolge der Auflösung: gleiche Datei →
+    verlinkte out_calls (auch über Import-Aliase) → im Repo eindeutiger
+    Funktionsname.
+    """
+    files_by_name: Dict[str, List[str]] = {}
+    for rel, meta in _callable_files(code_tree):
+        for fn in meta.get("functions", {}):
+            files_by_name.setdefault(fn, []).append(rel)
+
+    for rel, meta in _callable_files(code_tree):
+        local = meta.get("functions", {})
+        for fn, fn_meta in local.items():
+            linked = {call: (dst, name) for dst, name, call in fn_meta.get("out_calls", [])}
+            for call in fn_meta.get("calls", []):
+                if call in local:
+                    dst, name = rel, call
+                elif call in linked:
+                    dst, name = linked[call]
+                elif len(files_by_name.get(call, [])) == 1:
+                    dst, name = files_by_name[call][0], call
+                else:
+                    dst, name = None, None
+                yield rel, fn, call, dst, name
+
+
+# ════════════════════════════════════════════════════════════════════
+#  CSR-Aufbau
+# ════════════════════════════════════════════════════════════════════
+def _csr(n: int, src: List[int], dst: List[int]):
+    """Counting-Sort nach Quelle → (offsets, targets)."""
+    if np is not None:
+        s = np.asarray(src, dtype=np.int64)
+        d = np.asarray(dst, dtype=np.int32)
+        order = np.argsort(s, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(s, minlength=n), out=offsets[1:])
+        return offsets, d[order]
+
+    counts = [0] * (n + 1)
+    for s in src:
+        counts[s + 1] += 1
+    for i in range(n):
+        counts[i + 1] += counts[i]
+    offsets = array("q", counts)
+    fill = list(counts[:-1])
+    targets = array("i", bytes(4 * len(dst)))
+    for s, d in zip(src, dst):
+        targets[fill[s]] = d
+        fill[s] += 1
+    return offsets, targets
+
+
+def _bfs(n: int, offsets, targets, sources: Iterable[int]):
+    """Markiert alle von `sources` erreichbaren Knoten (inkl. sources)."""
+    sources = list(sources)
+    if np is not None:
+        visited = np.zeros(n, dtype=bool)
+        frontier = np.unique(np.asarray(sources, dtype=np.int64))
+        visited[frontier] = True
+        while frontier.size:
+            starts = offsets[frontier]
+            lens = offsets[frontier + 1] - starts
+            total = int(lens.sum())
+            if not total:
+                break
+            idx = np.repeat(starts - np.cumsum(lens) + lens, lens) + np.arange(total)
+            nb = targets[idx]
+            nb = np.unique(nb[~visited[nb]])
+            visited[nb] = True
+            frontier = nb.astype(np.int64)
+        return visited
+
+    visited = bytearray(n)
+    queue = deque()
+    for s in sources:
+        if not visited[s]:
+            visited[s] = 1
+            queue.append(s)
+    while queue:
+        v = queue.popleft()
+        for i in range(offsets[v], offsets[v + 1]):
+            w = targets[i]
+            if not visited[w]:
+                visited[w] = 1
+                queue.append(w)
+    return visited
+
+
+def _ids(mask) -> List[int]:
+    if np is not None:
+        return np.flatnonzero(mask).tolist()
+    return [i for i, v in enumerate(mask) if v]
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Graph
+# ════════════════════════════════════════════════════════════════════
+class CallGraph:
+    def __init__(self, nodes: List[Tuple[str, str]], routes: Dict[int, str],
+                 src: List[int], dst: List[int]):
+        self.nodes = nodes                      # id -> (datei, funktion)
+        self.ids = {node: i for i, node in enumerate(nodes)}
+        self.routes = routes                    # id -> route
+        self.n = len(nodes)
+        self.m = len(src)
+        self.offsets, self.targets = _csr(self.n, src, dst)
+        self.r_offsets, self.r_targets = _csr(self.n, dst, src)
+
+    @classmethod
+    def from_code_tree(cls, code_tree: Dict[str, dict]) -> "CallGraph":
+        nodes: List[Tuple[str, str]] = []
+        routes: Dict[int, str] = {}
+        ids: Dict[Tuple[str, str], int] = {}
+        for rel, meta in _callable_files(code_tree):
+            for fn, fn_meta in meta.get("functions", {}).items():
+                ids[(rel, fn)] = len(nodes)
+                if fn_meta.get("route"):
+                    routes[len(nodes)] = fn_meta["route"]
+                nodes.append((rel, fn))
+
+        src: List[int] = []
+        dst: List[int] = []
+        seen = set()
+        for rel, fn, _call, dst_rel, dst_fn in resolve_calls(code_tree):
+            if dst_rel is None:
+                continue
+            edge = (ids[(rel, fn)], ids[(dst_rel, dst_fn)])
+            if edge[0] != edge[1] and edge not in seen:
+                seen.add(edge)
+                src.append(edge[0])
+                dst.append(edge[1])
+        return cls(nodes, routes, src, dst)
+
+    # ---------------------------------------------------- Abfragen --
+    def degree(self, v: int) -> Tuple[int, int]:
+        """(eingehend, ausgehend)"""
+        return (int(self.r_offsets[v + 1] - self.r_offsets[v]),
+                int(self.offsets[v + 1] - self.offsets[v]))
+
+    def reachable(self, sources: Iterable[int]) -> List[int]:
+        """Alle Funktionen, die von `sources` aus (transitiv) aufgerufen werden."""
+        return _ids(_bfs(self.n, self.offsets, self.targets, sources))
+
+    def reverse_reachable(self, targets: Iterable[int]) -> List[int]:
+        """Alle Funktionen, die `targets` (transitiv) aufrufen können."""
+        return _ids(_bfs(self.n, self.r_offsets, self.r_targets, targets))
+
+    def dead_code_candidates(self) -> List[Dict]:
+        """
+        Funktionen, die von keiner Route aus erreichbar sind. Magic-Methoden
+        (__x__) werden ausgelassen, da sie implizit aufgerufen werden.
+        """
+        mask = _bfs(self.n, self.offsets, self.targets, self.routes)
+        rows = []
+        for i in range(self.n):
+            if mask[i]:
+                continue
+            rel, fn = self.nodes[i]
+            if fn.startswith("__") and fn.endswith("__"):
+                continue
+            fan_in, fan_out = self.degree(i)
+            rows.append({"file": rel, "func": fn, "callers": fan_in, "callees": fan_out})
+        rows.sort(key=lambda r: (r["callers"], r["file"], r["func"]))
+        return rows
+
+    def route_rows(self) -> List[Dict]:
+        """
+        Je Route: direkt aufgerufene Funktionen, transitiv erreichte
+        Funktionen (reach) und transitive Aufrufer (reached_by), jeweils
+        ohne die Route selbst.
+        """
+        rows = []
+        for v, route in self.routes.items():
+            rel, fn = self.nodes[v]
+            rows.append({
+                "route":      route,
+                "file":       rel,
+                "func":       fn,
+                "callees":    self.degree(v)[1],
+                "reach":      len(self.reachable([v])) - 1,
+                "reached_by": len(self.reverse_reachable([v])) - 1,
+            })
+        rows.sort(key=lambda r: (r["route"], r["file"]))
+        return rows
+
+
+def analyse(code_tree: Dict[str, dict]) -> Dict:
+    """Kompaktes Ergebnis für die Ergebnisansicht."""
+    graph = CallGraph.from_code_tree(code_tree)
+    return {
+        "functions":  graph.n,
+        "edges":      graph.m,
+        "routes":     graph.route_rows(),
+        "dead_code":  graph.dead_code_candidates(),
+    }
@@ -0,0 +1,70 @@
+"""
+Gestreamter Export aller Artefakte als ZIP oder tar.gz.
+
+Die Einträge werden als (name, erzeuger) übergeben und erst beim
+Schreiben erzeugt; nach jedem Eintrag wird der bis dahin geschriebene
+Teil des Archivs ausgeliefert. Im Speicher liegt so immer nur das
+aktuelle Artefakt, nie das ganze Bundle.
+"""
+import io
+import tarfile
+import time
+import zipfile
+from typing import Callable, Iterable, Iterator, Tuple
+
+FORMATS = {
+    "zip":    ("application/zip", ".zip"),
+    "tar.gz": ("application/gzip", ".tar.gz"),
+}
+
+Entry = Tuple[str, Callable[[], str]]
+
+
+class _Sink(io.RawIOBase):
+    """Nicht-seekbarer Schreibpuffer, der nach jedem Eintrag geleert wird."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _stream_zip(entries: Iterable[Entry], root: str) -> Iterator[bytes]:
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, produce in entries:
+            zf.writestr(f"{root}/{name}", produce() or "")
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _stream_tar(entries: Iterable[Entry], root: str) -> Iterator[bytes]:
+    sink = _Sink()
+    with tarfile.open(fileobj=sink, mode="w|gz") as tf:
+        for name, produce in entries:
+            data = (produce() or "").encode("utf-8")
+            info = tarfile.TarInfo(f"{root}/{name}")
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tf.addfile(info, io.BytesIO(data))
+            del data
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_bundle(entries: Iterable[Entry], fmt: str, root: str) -> Iterator[bytes]:
+    """Generator über die Bytes des Archivs (fmt: "zip" oder "tar.gz")."""
+    if fmt == "tar.gz":
+        return _stream_tar(entries, root)
+    return _stream_zip(entries, root)
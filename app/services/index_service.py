@@ -0,0 +1,336 @@
+"""
+SQLite-Index für Analyse-Ergebnisse (Dateien, Funktionen, Klassen, Routen,
+Imports, aufgelöste Aufrufe). Eine Datenbank je Projekt und Commit:
+
+    app/data/index/<projekt>/<commit>.sqlite
+
+Indiziert wird immer das gesamte Archiv, einmal je Commit (siehe
+is_indexed), in einer Transaktion (Bulk-Insert, WAL-Modus). Nach einer
+Teilauswahl entsteht der Index im Hintergrund; bis dahin liefern die
+Abfragen None. Die Abfragen laufen nur über Indizes und brauchen den
+Analyzer nicht mehr.
+"""
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.services.settings_service import data_dir
+from app.services.callgraph_service import resolve_calls
+
+LATEST = "latest"
+# Wie viele Commit-Datenbanken je Projekt erhalten bleiben (neueste zuerst)
+KEEP_PER_PROJECT = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    id    INTEGER PRIMARY KEY,
+    path  TEXT NOT NULL UNIQUE,
+    ext   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    id      INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    name    TEXT NOT NULL,
+    class   TEXT NOT NULL DEFAULT '',
+    parent  TEXT NOT NULL DEFAULT '',
+    route   TEXT NOT NULL DEFAULT '',
+    lineno  INTEGER
+);
+CREATE TABLE IF NOT EXISTS classes (
+    id      INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    name    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    id      INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    lineno  INTEGER,
+    type    TEXT,
+    module  TEXT,
+    name    TEXT,
+    alias   TEXT
+);
+CREATE TABLE IF NOT EXISTS calls (
+    src_id  INTEGER NOT NULL REFERENCES functions(id),
+    callee  TEXT NOT NULL,
+    dst_id  INTEGER REFERENCES functions(id)
+);
+CREATE INDEX IF NOT EXISTS ix_functions_name  ON functions(name);
+CREATE INDEX IF NOT EXISTS ix_functions_file  ON functions(file_id);
+CREATE INDEX IF NOT EXISTS ix_functions_route ON functions(route) WHERE route != '';
+CREATE INDEX IF NOT EXISTS ix_classes_name    ON classes(name);
+CREATE INDEX IF NOT EXISTS ix_imports_module  ON imports(module);
+CREATE INDEX IF NOT EXISTS ix_imports_name    ON imports(name);
+CREATE INDEX IF NOT EXISTS ix_imports_alias   ON imports(alias);
+CREATE INDEX IF NOT EXISTS ix_calls_src       ON calls(src_id);
+CREATE INDEX IF NOT EXISTS ix_calls_dst       ON calls(dst_id);
+CREATE INDEX IF NOT EXISTS ix_calls_callee    ON calls(callee);
+"""
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Pfade & Verbindungen
+# ════════════════════════════════════════════════════════════════════
+def _safe(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name) or "_"
+
+
+def _project_dir(project: str) -> Path:
+    path = data_dir() / "index" / _safe(project)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def db_path(project: str, commit: str) -> Optional[Path]:
+    """Pfad der Datenbank; commit="latest" → zuletzt geschriebene Datenbank."""
+    pdir = _project_dir(project)
+    if commit == LATEST:
+        dbs = sorted(pdir.glob("*.sqlite"), key=lambda p: p.stat().st_mtime)
+        return dbs[-1] if dbs else None
+    path = pdir / f"{_safe(commit)}.sqlite"
+    return path
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=OFF")
+    return conn
+
+
+def is_indexed(project: str, commit: str) -> bool:
+    """Gibt es für den Commit bereits einen vollständigen Index?"""
+    path = db_path(project, commit)
+    if path is None or not path.exists():
+        return False
+    try:
+        with closing(_connect(path)) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'scope'").fetchone()
+    except sqlite3.Error:
+        return False
+    return row is not None and row["value"] == "full"
+
+
+def list_commits(project: str) -> List[str]:
+    pdir = _project_dir(project)
+    dbs = sorted(pdir.glob("*.sqlite"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [p.stem for p in dbs]
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Schreiben
+# ════════════════════════════════════════════════════════════════════
+def store_analysis(project: str, commit: str, code_tree: Dict[str, dict],
+                   analysis_rows: List[Dict]) -> Path:
+    """
+    Schreibt code_tree + analysis_rows (des gesamten Archivs) in die
+    Datenbank des Commits. Ein vorhandener Stand wird in derselben
+    Transaktion ersetzt.
+    """
+    path = db_path(project, commit)
+    rows_by_key = {}
+    for r in analysis_rows:
+        rows_by_key.setdefault((r["file"], r.get("func")), r)
+
+    with closing(_connect(path)) as conn, conn:
+        conn.executescript(_SCHEMA)
+        for table in ("calls", "imports", "classes", "functions", "files", "meta"):
+            conn.execute(f"DELETE FROM {table}")
+
+        # ── Dateien
+        file_ids = {rel: i for i, rel in enumerate(sorted(code_tree), start=1)}
+        conn.executemany(
+            "INSERT INTO files(id, path, ext) VALUES (?, ?, ?)",
+            [(fid, rel, Path(rel).suffix.lower()) for rel, fid in file_ids.items()],
+        )
+
+        # ── Funktionen
+        func_rows = []
+        func_ids: Dict[tuple, int] = {}
+        for rel, meta in code_tree.items():
+            parent_of = {
+                inner: parent
+                for parent, inners in meta.get("nested", {}).items()
+                for inner in inners
+            }
+            for fn, fn_meta in meta.get("functions", {}).items():
+                fid = len(func_rows) + 1
+                row = rows_by_key.get((rel, fn), {})
+                func_rows.append((
+                    fid, file_ids[rel], fn, row.get("class", "") or "",
+                    parent_of.get(fn, ""), fn_meta.get("route", "") or "",
+                    row.get("lineno"),
+                ))
+                func_ids[(rel, fn)] = fid
+        conn.executemany(
+            "INSERT INTO functions(id, file_id, name, class, parent, route, lineno) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            func_rows,
+        )
+
+        # ── Klassen (aus der Funktionstabelle)
+        classes = sorted({(r["file"], r["class"]) for r in analysis_rows
+                          if r.get("class") and r["file"] in file_ids})
+        conn.executemany(
+            "INSERT INTO classes(file_id, name) VALUES (?, ?)",
+            [(file_ids[f], c) for f, c in classes],
+        )
+
+        # ── Imports
+        conn.executemany(
+            "INSERT INTO imports(file_id, lineno, type, module, name, alias) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (file_ids[rel], imp.get("lineno"), imp.get("type"),
+                 imp.get("module"), imp.get("name"), imp.get("alias"))
+                for rel, meta in code_tree.items()
+                for imp in meta.get("imports", [])
+            ],
+        )
+
+        # ── Aufrufe (Auflösung siehe callgraph_service.resolve_calls)
+        conn.executemany(
+            "INSERT INTO calls(src_id, callee, dst_id) VALUES (?, ?, ?)",
+            [
+                (func_ids[(rel, fn)], call, func_ids.get((dst, name)) if dst else None)
+                for rel, fn, call, dst, name in resolve_calls(code_tree)
+            ],
+        )
+
+        conn.executemany(
+            "INSERT INTO meta(key, value) VALUES (?, ?)",
+            [("project", project), ("commit", commit), ("scope", "full"),
+             ("created", str(int(time.time())))],
+        )
+    _prune(project, path)
+    return path
+
+
+def _prune(project: str, keep: Path) -> None:
+    """Entfernt ältere Datenbanken (samt WAL-/SHM-Dateien) über KEEP_PER_PROJECT hinaus."""
+    dbs = sorted(
+        (p for p in _project_dir(project).glob("*.sqlite") if p != keep),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for old in dbs[KEEP_PER_PROJECT - 1:]:
+        for part in (old, old.with_name(old.name + "-wal"), old.with_name(old.name + "-shm")):
+            try:
+                part.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                print(f"[index_service] Nicht entfernt: {part} ({exc})")
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Abfragen
+# ════════════════════════════════════════════════════════════════════
+def _query(project: str, commit: str, sql: str, params: tuple = ()) -> Optional[List[Dict]]:
+    path = db_path(project, commit)
+    if path is None or not path.exists():
+        return None
+    with closing(_connect(path)) as conn:
+        return [dict(r) for r in conn.execute(sql, params)]
+
+
+_FUNC_COLS = "f.name AS func, fi.path AS file, f.class AS class, f.lineno AS lineno, f.route AS route"
+
+
+def callers(project: str, commit: str, func: str, file: Optional[str] = None) -> Optional[List[Dict]]:
+    """
+    Wer ruft `func` auf? Aufgelöste Kanten nach Ziel-Funktion (auch über
+    Import-Aliase) + unaufgelöste Aufrufe gleichen Namens.
+    """
+    sql = f"""
+        SELECT DISTINCT {_FUNC_COLS}, c.dst_id IS NOT NULL AS resolved
+        FROM calls c
+        JOIN functions f  ON f.id = c.src_id
+        JOIN files fi     ON fi.id = f.file_id
+        LEFT JOIN functions d ON d.id = c.dst_id
+        LEFT JOIN files dfi   ON dfi.id = d.file_id
+        WHERE (d.name = ? OR (c.dst_id IS NULL AND c.callee = ?))
+          AND (c.dst_id IS NULL OR ? IS NULL OR dfi.path = ?)
+        ORDER BY fi.path, f.lineno
+    """
+    return _query(project, commit, sql, (func, func, file, file))
+
+
+def callees(project: str, commit: str, func: str, file: Optional[str] = None) -> Optional[List[Dict]]:
+    """
+    Was ruft `func` auf? Aufgelöste Aufrufe mit Name, Datei und Zeile der
+    Ziel-Funktion, sonst der Name an der Aufrufstelle.
+    """
+    sql = """
+        SELECT DISTINCT COALESCE(d.name, c.callee) AS func, dfi.path AS file, d.lineno AS lineno,
+               c.dst_id IS NOT NULL AS resolved
+        FROM functions f
+        JOIN files fi        ON fi.id = f.file_id
+        JOIN calls c         ON c.src_id = f.id
+        LEFT JOIN functions d ON d.id = c.dst_id
+        LEFT JOIN files dfi   ON dfi.id = d.file_id
+        WHERE f.name = ? AND (? IS NULL OR fi.path = ?)
+        ORDER BY func
+    """
+    return _query(project, commit, sql, (func, file, file))
+
+
+def reachable(project: str, commit: str, func: str,
+              file: Optional[str] = None) -> Optional[List[Dict]]:
+    """
+    Alle Funktionen, die von `func` aus transitiv über aufgelöste Aufrufe
+    erreicht werden (ohne `func` selbst). Rekursive CTE mit UNION: jede
+    Funktion wird höchstens einmal besucht.
+    """
+    sql = f"""
+        WITH RECURSIVE
+          start(id) AS (
+            SELECT f.id FROM functions f JOIN files fi ON fi.id = f.file_id
+            WHERE f.name = ? AND (? IS NULL OR fi.path = ?)
+          ),
+          reach(id) AS (
+            SELECT id FROM start
+            UNION
+            SELECT c.dst_id FROM calls c JOIN reach r ON c.src_id = r.id
+            WHERE c.dst_id IS NOT NULL
+          )
+        SELECT {_FUNC_COLS}
+        FROM reach
+        JOIN functions f ON f.id = reach.id
+        JOIN files fi    ON fi.id = f.file_id
+        WHERE reach.id NOT IN (SELECT id FROM start)
+        ORDER BY fi.path, f.lineno
+    """
+    return _query(project, commit, sql, (func, file, file))
+
+
+def routes(project: str, commit: str) -> Optional[List[Dict]]:
+    sql = f"""
+        SELECT {_FUNC_COLS}
+        FROM functions f JOIN files fi ON fi.id = f.file_id
+        WHERE f.route != ''
+        ORDER BY f.route, fi.path
+    """
+    return _query(project, commit, sql)
+
+
+def imports(project: str, commit: str, module: Optional[str] = None,
+            name: Optional[str] = None) -> Optional[List[Dict]]:
+    """Import-Suche nach Modul und/oder importiertem Namen (Name oder Alias)."""
+    sql = """
+        SELECT fi.path AS file, i.lineno, i.type, i.module, i.name, i.alias
+        FROM imports i JOIN files fi ON fi.id = i.file_id
+        WHERE (? IS NULL OR i.module = ?)
+          AND (? IS NULL OR i.name = ? OR i.alias = ?)
+        ORDER BY fi.path, i.lineno
+    """
+    return _query(project, commit, sql, (module, module, name, name, name))
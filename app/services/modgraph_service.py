@@ -0,0 +1,260 @@
+"""
+Modul-Abhängigkeitsgraph aus den Imports des code_tree.
+
+Einmal pro Analyse aufgebaut:
+  * Imports werden gegen die Dateien des Archivs aufgelöst (Python: absolut,
+    relativ, Pakete/__init__.py; JS/TS/CSS: relative Pfade mit Endungen
+    und index-Dateien). Nicht auflösbare Imports zählen als extern.
+  * Zyklen über Tarjans SCC-Algorithmus (iterativ), Schichten über die
+    Kondensation in topologischer Reihenfolge, Fan-in/Fan-out je Modul.
+Alles linear in Modulen + Import-Kanten.
+"""
+import posixpath
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+_PY_EXT = ".py"
+_JS_EXTS = ("", ".js", ".ts", ".tsx", ".jsx", ".mjs", ".cjs", ".mts", ".cts", ".css")
+
+
+def _trim(rel: str) -> str:
+    parts = rel.split("/")
+    return "/".join(parts[1:]) if len(parts) > 1 else rel
+
+
+class ModuleGraph:
+    def __init__(self, code_tree: Dict[str, dict]):
+        self.files: List[str] = list(code_tree)
+        self._by_trim: Dict[str, str] = {_trim(rel): rel for rel in self.files}
+        self._dotted: Dict[str, str] = {}
+        self._index_python()
+
+        self.deps: Dict[str, Set[str]] = {rel: set() for rel in self.files}
+        self.external: Dict[str, int] = defaultdict(int)
+        # gebundener Name → (Ziel-Datei, Name dort); für "from x import f as g" → Aufruf g()
+        self.bindings: Dict[str, Dict[str, Tuple[str, str]]] = {rel: {} for rel in self.files}
+        # Ziel-Datei je Import (parallel zu meta["imports"], None = extern)
+        self.import_targets: Dict[str, List[Optional[str]]] = {rel: [] for rel in self.files}
+        self._name2modules: Dict[str, Set[str]] = defaultdict(set)
+        self._imports = []
+
+        # ── ein Durchlauf über alle Imports
+        for rel, meta in code_tree.items():
+            for imp in meta.get("imports", []):
+                self._imports.append((rel, imp))
+                n = imp.get("alias") or imp.get("name")
+                if n:
+                    self._name2modules[n].add(imp.get("module", ""))
+                target = self.resolve(rel, imp)
+                self.import_targets[rel].append(target)
+                if target is None:
+                    self.external[rel] += 1
+                    continue
+                if target != rel:
+                    self.deps[rel].add(target)
+                if imp.get("type") == "from" and imp.get("name") not in (None, "*"):
+                    self.bindings[rel][imp.get("alias") or imp["name"]] = (target, imp["name"])
+
+        self.rdeps: Dict[str, Set[str]] = {rel: set() for rel in self.files}
+        for src, targets in self.deps.items():
+            for dst in targets:
+                self.rdeps[dst].add(src)
+
+        self.sccs: List[List[str]] = self._tarjan()
+        self.layer: Dict[str, int] = self._layers()
+
+    # ════════════════════════════════════════════════════════════════
+    #  Auflösung
+    # ════════════════════════════════════════════════════════════════
+    def _index_python(self) -> None:
+        """
+        Punktnamen → Datei. Registriert wird der volle Pfad sowie der Name
+        ab dem obersten Paket (Ordnerkette mit __init__.py), damit z.B.
+        src/pkg/mod.py als pkg.mod gefunden wird.
+        """
+        packages = {
+            posixpath.dirname(t) for t in self._by_trim
+            if posixpath.basename(t) == "__init__.py"
+        }
+        for trim, rel in self._by_trim.items():
+            if not trim.endswith(_PY_EXT):
+                continue
+            parts = trim[:-len(_PY_EXT)].split("/")
+            if parts[-1] == "__init__":
+                parts = parts[:-1]
+            if not parts:
+                continue
+            self._dotted.setdefault(".".join(parts), rel)
+
+            start = len(parts) - 1
+            while start > 0 and "/".join(parts[:start]) in packages:
+                start -= 1
+            if start + 1 < len(parts) and "/".join(parts[:start + 1]) in packages:
+                self._dotted.setdefault(".".join(parts[start:]), rel)
+
+    def _py_module(self, dotted: str, base_dir: Optional[str] = None) -> Optional[str]:
+        if base_dir is not None:
+            path = posixpath.join(base_dir, *dotted.split(".")) if dotted else base_dir
+            for cand in (path + _PY_EXT, posixpath.join(path, "__init__.py")):
+                if cand in self._by_trim:
+                    return self._by_trim[cand]
+            return None
+        return self._dotted.get(dotted)
+
+    def resolve(self, origin: str, imp: Dict) -> Optional[str]:
+        """Ziel-Datei eines Imports oder None (extern / nicht im Archiv)."""
+        module = imp.get("module") or ""
+        origin_dir = posixpath.dirname(_trim(origin))
+
+        if not origin.endswith(_PY_EXT):
+            if not module.startswith("."):
+                return None
+            path = posixpath.normpath(posixpath.join(origin_dir, module))
+            for ext in _JS_EXTS:
+                for cand in (path + ext, posixpath.join(path, "index" + ext)):
+                    if cand in self._by_trim:
+                        return self._by_trim[cand]
+            return None
+
+        level = len(module) - len(module.lstrip("."))
+        name = module[level:]
+        sub = imp.get("name") if imp.get("type") == "from" and imp.get("name") != "*" else None
+
+        if level:
+            base = origin_dir
+            for _ in range(level - 1):
+                base = posixpath.dirname(base)
+            if sub:
+                hit = self._py_module(f"{name}.{sub}" if name else sub, base)
+                if hit:
+                    return hit
+            return self._py_module(name, base)
+
+        candidates = [f"{name}.{sub}", name] if sub else [name]
+        for dotted in candidates:
+            # Skript-Stil: Nachbarmodul im selben Ordner, sonst global
+            hit = self._py_module(dotted, origin_dir) or self._py_module(dotted)
+            if hit:
+                return hit
+        return None
+
+    # ════════════════════════════════════════════════════════════════
+    #  Tarjan (iterativ) & Schichten
+    # ════════════════════════════════════════════════════════════════
+    def _tarjan(self) -> List[List[str]]:
+        """SCCs in umgekehrter topologischer Reihenfolge (Abhängigkeiten zuerst)."""
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        sccs: List[List[str]] = []
+        counter = 0
+
+        for root in self.files:
+            if root in index:
+                continue
+            work = [(root, iter(sorted(self.deps[root])))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                v, it = work[-1]
+                advanced = False
+                for w in it:
+                    if w not in index:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack.add(w)
+                        work.append((w, iter(sorted(self.deps[w]))))
+                        advanced = True
+                        break
+                    if w in on_stack:
+                        low[v] = min(low[v], index[w])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == index[v]:
+                    comp = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        comp.append(w)
+                        if w == v:
+                            break
+                    sccs.append(sorted(comp))
+        return sccs
+
+    def _layers(self) -> Dict[str, int]:
+        """
+        Schicht 0 = Module ohne interne Abhängigkeiten; sonst 1 + max der
+        Abhängigkeiten. Module eines Zyklus teilen sich eine Schicht.
+        """
+        comp_of = {m: i for i, comp in enumerate(self.sccs) for m in comp}
+        comp_layer: List[int] = []
+        for i, comp in enumerate(self.sccs):
+            layer = 0
+            for m in comp:
+                for dep in self.deps[m]:
+                    j = comp_of[dep]
+                    if j != i:
+                        layer = max(layer, comp_layer[j] + 1)
+            comp_layer.append(layer)
+        return {m: comp_layer[comp_of[m]] for m in self.files}
+
+    # ════════════════════════════════════════════════════════════════
+    #  Auswertungen
+    # ════════════════════════════════════════════════════════════════
+    def cycles(self) -> List[List[str]]:
+        return [c for c in self.sccs if len(c) > 1]
+
+    def topological_order(self) -> List[str]:
+        """Abhängigkeiten vor ihren Nutzern."""
+        return [m for comp in self.sccs for m in comp]
+
+    def module_rows(self) -> List[Dict]:
+        cyclic = {m for comp in self.cycles() for m in comp}
+        rows = [
+            {
+                "file":     rel,
+                "layer":    self.layer[rel],
+                "fan_in":   len(self.rdeps[rel]),
+                "fan_out":  len(self.deps[rel]),
+                "external": self.external.get(rel, 0),
+                "cycle":    rel in cyclic,
+            }
+            for rel in self.files
+            if self.deps[rel] or self.rdeps[rel] or self.external.get(rel)
+        ]
+        rows.sort(key=lambda r: (r["layer"], -r["fan_in"], r["file"]))
+        return rows
+
+    def import_conflicts(self) -> List[Dict]:
+        """Gleicher Name aus unterschiedlichen Modulen importiert."""
+        conflicts = []
+        for rel, imp in self._imports:
+            n = imp.get("alias") or imp.get("name")
+            mods = self._name2modules.get(n, set())
+            if n and len(mods) > 1:
+                conflicts.append({
+                    "file": rel, "lineno": imp["lineno"],
+                    "name": n, "modules": sorted(mods)
+                })
+        return conflicts
+
+
+def build(code_tree: Dict[str, dict]) -> ModuleGraph:
+    return ModuleGraph(code_tree)
+
+
+def format_modules_tsv(graph: ModuleGraph) -> str:
+    headers = ["file", "layer", "fan_in", "fan_out", "external", "cycle"]
+    lines = ["\t".join(headers)]
+    for r in graph.module_rows():
+        lines.append("\t".join(str(r[c]) for c in headers))
+    return "\n".join(lines)
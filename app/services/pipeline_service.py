@@ -0,0 +1,156 @@
+"""
+Kleine DAG-Pipeline für Artefakte.
+
+Jeder Schritt deklariert seine Eingaben (Namen anderer Schritte oder
+vorgegebener Werte). run() berechnet nur, was für die angeforderten Ziele
+nötig ist, jeden Schritt genau einmal. Schritte laufen seriell im
+aufrufenden Thread; nur mit threaded=True markierte Schritte gehen auf
+einen Thread-Pool und überlappen mit den übrigen.
+
+    pipe = Pipeline()
+    pipe.add("imports_rows", utils.collect_import_rows, "code_tree")
+    pipe.add("imports.tsv",  utils.format_imports_tsv, "imports_rows")
+    pipe.run(["imports.tsv"], {"code_tree": code_tree})
+
+threaded lohnt nur für Schritte, die den GIL freigeben (I/O, zlib, NumPy,
+...): reine Python-Schritte würden sich im Pool nur abwechseln und zahlen
+zusätzlich den Thread-Overhead.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app import utils
+from app.services import uml_service, callgraph_service, modgraph_service
+
+# Obergrenze der Worker je Lauf
+MAX_WORKERS = 4
+
+
+class Pipeline:
+    def __init__(self):
+        self._steps: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+        self._threaded: Set[str] = set()
+
+    def add(self, name: str, func: Callable, *inputs: str, threaded: bool = False) -> "Pipeline":
+        """Registriert einen Schritt; func wird mit den Eingaben in Reihenfolge aufgerufen."""
+        self._steps[name] = (func, inputs)
+        if threaded:
+            self._threaded.add(name)
+        else:
+            self._threaded.discard(name)
+        return self
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._steps)
+
+    def _needed(self, targets: Iterable[str], values: Dict) -> Set[str]:
+        needed: Set[str] = set()
+        todo = [t for t in targets if t not in values]
+        while todo:
+            name = todo.pop()
+            if name in needed:
+                continue
+            if name not in self._steps:
+                raise KeyError(f"Unbekanntes Artefakt bzw. fehlende Eingabe: {name}")
+            needed.add(name)
+            todo.extend(i for i in self._steps[name][1] if i not in values)
+        return needed
+
+    def run(self, targets: Iterable[str], values: Optional[Dict] = None,
+            max_workers: int = MAX_WORKERS) -> Dict:
+        """
+        Berechnet `targets` und liefert values (Eingaben + alle berechneten
+        Zwischenergebnisse). Ein übergebenes values-Dict wird ergänzt, so dass
+        spätere Läufe Zwischenergebnisse wiederverwenden. Der erste Fehler
+        eines Schritts wird weitergereicht.
+        """
+        values = {} if values is None else values
+        pending = self._needed(targets, values)
+        if not pending:
+            return values
+
+        pool = None
+        running = {}
+        try:
+            while pending or running:
+                ready = [n for n in pending if all(i in values for i in self._steps[n][1])]
+                pending.difference_update(ready)
+                inline = []
+                for name in ready:
+                    func, inputs = self._steps[name]
+                    if name in self._threaded:
+                        if pool is None:
+                            pool = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                                      thread_name_prefix="gitload-pipeline")
+                        running[pool.submit(func, *(values[i] for i in inputs))] = name
+                    else:
+                        inline.append(name)
+
+                for name in inline:
+                    func, inputs = self._steps[name]
+                    values[name] = func(*(values[i] for i in inputs))
+
+                if inline:
+                    done = [fut for fut in running if fut.done()]
+                elif running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                else:
+                    raise ValueError(f"Zyklische Abhängigkeit: {sorted(pending)}")
+                for fut in done:
+                    values[running.pop(fut)] = fut.result()
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        return values
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Artefakte von full_output / export
+#
+#  Eingaben (aus repo_service.get_zip_full_output bzw. der Konfiguration):
+#  structure_str, content_str, handover_md, handover_clean_md,
+#  analysis_rows, code_tree, module_graph
+# ════════════════════════════════════════════════════════════════════
+def _combined_text(structure_str: str, content_str: str) -> str:
+    return ("Struktur der ZIP-Datei:\n" + structure_str + "\n\n" +
+            "Einsicht in die Dateien:\n" + content_str)
+
+
+def _tree_text(code_tree: Dict, structure_str: str) -> str:
+    # structure_str ist bereits format_directory_tree(code_tree), sofern es Code gibt
+    return structure_str if code_tree else utils.format_directory_tree(code_tree)
+
+
+def _dead_code_tsv(reachability: Dict) -> str:
+    return "\n".join(
+        ["file\tfunc\tcallers\tcallees"] +
+        [f"{r['file']}\t{r['func']}\t{r['callers']}\t{r['callees']}"
+         for r in reachability["dead_code"]]
+    )
+
+
+ARTIFACTS = (
+    Pipeline()
+    .add("files.txt",         _combined_text, "structure_str", "content_str")
+    .add("handover.md",       lambda md: md, "handover_md")
+    .add("handover_clean.md", lambda md: md, "handover_clean_md")
+    .add("col_order",         utils.function_columns, "analysis_rows")
+    .add("functions.md",      utils.format_function_markdown, "analysis_rows")
+    .add("functions.csv",     utils.format_function_csv, "analysis_rows")
+    .add("imports_rows",      utils.collect_import_rows, "code_tree")
+    .add("imports.tsv",       utils.format_imports_tsv, "imports_rows")
+    .add("tree.txt",          _tree_text, "code_tree", "structure_str")
+    # seriell: den Großteil der Zeit kostet der Graph-Aufbau (resolve_calls,
+    # reines Python); nur die BFS mit NumPy gäbe den GIL frei
+    .add("reachability",      callgraph_service.analyse, "code_tree")
+    .add("dead_code.tsv",     _dead_code_tsv, "reachability")
+    .add("module_rows",       lambda g: g.module_rows(), "module_graph")
+    .add("module_cycles",     lambda g: g.cycles(), "module_graph")
+    .add("modules.tsv",       modgraph_service.format_modules_tsv, "module_graph")
+    .add("uml_index",         uml_service.index_code_tree, "code_tree", "module_graph")
+    .add("uml.puml",          lambda ct, ix: uml_service.build_package_uml(ct, ix),
+         "code_tree", "uml_index")
+    .add("code_tree.json",    lambda ct: json.dumps(ct, default=list), "code_tree")
+)
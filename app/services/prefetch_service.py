@@ -0,0 +1,157 @@
+"""
+Optionaler Hintergrund-Prefetch der in settings.json konfigurierten Projekte.
+
+Ein Daemon-Thread läuft alle PREFETCH_INTERVAL Sekunden (+ Jitter) über
+alle Projekte und ruft repo_service.prefetch auf (If-None-Match, bei
+neuem Commit Vollanalyse). Höchstens PREFETCH_CONCURRENCY Projekte
+parallel. Solange interaktive Anfragen laufen, wartet der Prefetch vor
+dem Start und pausiert auch während der Analyse (je Datei), insgesamt
+höchstens MAX_IDLE_WAIT Sekunden je Projekt und Lauf.
+
+Bei mehreren Gunicorn-Workern startet nur der Worker den Scheduler, der
+die Dateisperre app/data/prefetch.lock hält. Er wärmt seine eigenen
+Caches sowie den SQLite-Index, der für alle Worker auf Platte liegt.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+try:  # nur POSIX; ohne fcntl startet jeder Prozess seinen Scheduler
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from app.services import repo_service, settings_service
+
+# Wie lange ein Projekt insgesamt höchstens auf Leerlauf wartet (Sekunden)
+MAX_IDLE_WAIT = 300
+# Prüfabstand, solange interaktive Anfragen laufen (Sekunden)
+IDLE_POLL = 0.2
+
+_status: Dict[str, Dict] = {}
+_status_lock = threading.Lock()
+_active_requests = 0
+_active_lock = threading.Lock()
+_started = False
+_lock_file = None
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Interaktive Last (vom Blueprint gemeldet)
+# ════════════════════════════════════════════════════════════════════
+def request_started() -> None:
+    global _active_requests
+    with _active_lock:
+        _active_requests += 1
+
+
+def request_finished(_exc=None) -> None:
+    global _active_requests
+    with _active_lock:
+        _active_requests = max(0, _active_requests - 1)
+
+
+def _idle_waiter() -> Callable[[], None]:
+    """
+    Wartet bei jedem Aufruf, bis keine interaktive Anfrage mehr läuft; die
+    Wartezeit aller Aufrufe zusammen ist auf MAX_IDLE_WAIT begrenzt, damit
+    ein Projekt unter Dauerlast trotzdem fertig wird.
+    """
+    deadline = time.monotonic() + MAX_IDLE_WAIT
+
+    def wait() -> None:
+        while _active_requests and time.monotonic() < deadline:
+            time.sleep(IDLE_POLL)
+    return wait
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Status
+# ════════════════════════════════════════════════════════════════════
+def status() -> Dict[str, Dict]:
+    with _status_lock:
+        return {k: dict(v) for k, v in _status.items()}
+
+
+def _update(project_key: str, **values) -> None:
+    with _status_lock:
+        _status.setdefault(project_key, {}).update(values)
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Ablauf
+# ════════════════════════════════════════════════════════════════════
+def _prefetch_project(project_key: str, repo_url: str, token: str, jitter: float) -> None:
+    time.sleep(random.uniform(0, jitter))
+    wait_for_idle = _idle_waiter()
+    wait_for_idle()
+
+    last_commit = status().get(project_key, {}).get("commit")
+    _update(project_key, running=True)
+    started = time.time()
+    try:
+        result = repo_service.prefetch(repo_url, token, project_key, last_commit,
+                                       pause=wait_for_idle)
+        _update(project_key, error="", **result)
+    except Exception as exc:  # Hintergrund-Thread darf nicht sterben
+        _update(project_key, error=str(exc), changed=False)
+    finally:
+        _update(project_key, running=False, last_run=started,
+                duration=round(time.time() - started, 2))
+
+
+def run_once(concurrency: int = 1, jitter: float = 0.0) -> None:
+    settings = settings_service.read_settings()
+    token = settings.get("token", "")
+    projects = settings.get("projects", {})
+    if not token or not projects:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, concurrency),
+                            thread_name_prefix="gitload-prefetch") as pool:
+        for key, url in sorted(projects.items()):
+            pool.submit(_prefetch_project, key, url, token, jitter)
+
+
+def _loop(interval: float, concurrency: int, jitter: float) -> None:
+    # erster Lauf kurz nach dem Start, danach im Intervall
+    time.sleep(random.uniform(0, jitter))
+    while True:
+        run_once(concurrency, jitter)
+        time.sleep(interval + random.uniform(0, jitter))
+
+
+def _acquire_scheduler_lock() -> bool:
+    """Nicht-blockierende Dateisperre; bleibt bis zum Prozessende gehalten."""
+    global _lock_file
+    if fcntl is None:
+        return True
+    handle = open(settings_service.data_dir() / "prefetch.lock", "a")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    _lock_file = handle
+    return True
+
+
+def start(app) -> None:
+    """
+    Startet den Scheduler (PREFETCH_INTERVAL > 0) einmal pro Prozess und
+    nur in dem Prozess, der die Dateisperre bekommt.
+    """
+    global _started
+    interval = app.config.get("PREFETCH_INTERVAL", 0)
+    if _started or interval <= 0:
+        return
+    if not _acquire_scheduler_lock():
+        return
+    _started = True
+    threading.Thread(
+        target=_loop,
+        args=(interval, app.config.get("PREFETCH_CONCURRENCY", 1), app.config.get("PREFETCH_JITTER", 30)),
+        name="gitload-prefetch-scheduler",
+        daemon=True,
+    ).start()
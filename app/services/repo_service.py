@@ -1,17 +1,24 @@
 import io
 import os
 import re
+import hashlib
+import sqlite3
+import threading
 import zipfile
 import requests
 from requests.exceptions import RequestException
-from typing import Dict, List, Tuple, Optional
-from collections import defaultdict
+from typing import Callable, Dict, List, Set, Tuple, Optional, Union
+from collections import OrderedDict
 from pathlib import Path
 
 # Import der Analyzer aus dem übergeordneten Modul
 from app.analyzer import REGISTRY
 # NEU: Importiere die Baum-Formatierung
 from app.utils import format_directory_tree
+from app.services import (
+    index_service, search_service, modgraph_service, selection_service,
+    stats_service,
+)
 
 def _iterate_files_with_content(tree: Dict, base: str = ""):
     for key, val in tree.items():
@@ -61,11 +68,18 @@ def _remove_comments(text: str, ext: str) -> str:
 # ════════════════════════════════════════════════════════════════════
 #  VERBESSERT: Hilfs-Generator: Repo-to-Markdown (Projektübergabe)
 # ════════════════════════════════════════════════════════════════════
-def _generate_markdown_handover(tree: Dict, structure_str: str, clean_mode: bool = False) -> str:
+def _generate_markdown_handover(
+    tree: Dict,
+    structure_str: str,
+    clean_mode: bool = False,
+    canonical: Optional[Dict[str, str]] = None,
+) -> str:
     """
     Erzeugt einen Markdown-String für LLM-Übergabe.
     Header-Tiefe (#) passt sich der Ordner-Tiefe an.
     Wenn clean_mode=True, werden Kommentare entfernt.
+    Mit canonical (rel_path -> erste Kopie) werden inhaltsgleiche Dateien
+    nur einmal ausgegeben, weitere Kopien als Verweis auf die erste.
     """
     lines = []
     
@@ -100,6 +114,7 @@ def _generate_markdown_handover(tree: Dict, structure_str: str, clean_mode: bool
     }
 
     # 3. Dateien durchgehen
+    first_printed: Dict[str, str] = {}
     for rel_path, content in _iterate_files_with_content(tree):
         # Pfad bereinigen und analysieren
         parts = rel_path.strip("/").split("/")
@@ -129,6 +144,16 @@ def _generate_markdown_handover(tree: Dict, structure_str: str, clean_mode: bool
         if rel_path.endswith("Dockerfile"):
             lang = "dockerfile"
         
+        # Duplikat? → nur Verweis auf die erste ausgegebene Kopie
+        if canonical is not None:
+            blob = canonical.get(rel_path, rel_path)
+            if blob in first_printed:
+                lines.append(f"{hashes} {clean_path}")
+                lines.append(f"_Identisch mit `{first_printed[blob]}`._")
+                lines.append("")
+                continue
+            first_printed[blob] = clean_path
+
         # Inhalt vorbereiten (ggf. bereinigen)
         final_content = content
         if clean_mode and ext in ['.py', '.html', '.js', '.css']:
@@ -143,44 +168,409 @@ def _generate_markdown_handover(tree: Dict, structure_str: str, clean_mode: bool
     return "\n".join(lines)
 
 
+# Bytes, die je Datei gelesen und übernommen werden (Rest wird gekürzt)
+MAX_FILE_BYTES = 50_000
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Deduplizierung identischer Dateien
+# ════════════════════════════════════════════════════════════════════
+class _BlobIndex:
+    """
+    Gruppiert ZIP-Member nach Inhalt. (CRC32, Größe) aus dem ZIP-Verzeichnis
+    dient als billiger Vorfilter; erst bei einem Treffer wird per SHA-256
+    bestätigt (der erste Member der Gruppe wird dafür ggf. nachgelesen).
+    Jeder eindeutige Inhalt wird nur einmal dekodiert und gehalten.
+    """
+
+    def __init__(self, zip_file: zipfile.ZipFile, limit: int):
+        self._zip = zip_file
+        self._limit = limit
+        self._groups: Dict[Tuple[int, int], List[Dict]] = {}
+        self.canonical: Dict[str, str] = {}   # rel_path -> rel_path der ersten Kopie
+
+    def add(self, info: zipfile.ZipInfo, rel_path: str, raw: bytes) -> str:
+        """Liefert den (ggf. geteilten) Text-Inhalt des Members."""
+        key = (info.CRC, info.file_size)
+        group = self._groups.setdefault(key, [])
+        digest = hashlib.sha256(raw).hexdigest() if group else None
+
+        for blob in group:
+            if blob["digest"] is None:
+                with self._zip.open(blob["info"]) as f:
+                    blob["digest"] = hashlib.sha256(f.read(self._limit)).hexdigest()
+            if blob["digest"] == digest:
+                self.canonical[rel_path] = blob["rel"]
+                return blob["text"]
+
+        text = raw.decode("utf-8", errors="ignore")
+        group.append({"info": info, "rel": rel_path, "digest": digest, "text": text})
+        self.canonical[rel_path] = rel_path
+        return text
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Analyse-Cache je Datei-Inhalt (prozessweit, LRU)
+# ════════════════════════════════════════════════════════════════════
+ANALYSIS_CACHE_SIZE = 50_000
+
+_ANALYSIS: "OrderedDict[Tuple[str, str], Tuple[Dict, Optional[List[Dict]], Optional[List[Dict]]]]" = OrderedDict()
+_ANALYSIS_LOCK = threading.Lock()
+
+
+def _analyse_file(rel_path: str, text: str, suffix: str,
+                  detailed: bool = True) -> Tuple[Dict, List[Dict], List[Dict]]:
+    """
+    (analyse_tree, analyse, analyse_aliases) für einen Inhalt. Schlüssel ist
+    Endung + SHA-1 des Textes, daher über Commits/Projekte hinweg gültig.
+    Mit detailed=False läuft nur analyse_tree (Zeilen/Aliase bleiben leer,
+    bis ein detaillierter Aufruf sie nachträgt).
+    Die Ergebnisse sind geteilt und dürfen nicht verändert werden.
+    """
+    key = (suffix, hashlib.sha1(text.encode("utf-8", errors="ignore")).hexdigest())
+    with _ANALYSIS_LOCK:
+        entry = _ANALYSIS.get(key)
+        if entry is not None:
+            _ANALYSIS.move_to_end(key)
+    if entry is not None and (entry[1] is not None or not detailed):
+        return entry[0], entry[1] or [], entry[2] or []
+
+    analyzer = REGISTRY[suffix]
+
+    if entry is not None:
+        tree_meta = entry[0]
+    elif hasattr(analyzer, "analyse_tree"):
+        # Code Tree immer befüllen für die Visualisierung
+        tree_meta = analyzer.analyse_tree(rel_path, text)
+    else:
+        # Falls kein Analyzer für Dateityp da ist, leeren Eintrag, damit Datei existiert
+        tree_meta = {}
+
+    rows = alias_rows = None
+    if detailed:
+        rows = analyzer.analyse(rel_path, text)
+        alias_rows = analyzer.analyse_aliases(rel_path, text) if hasattr(analyzer, "analyse_aliases") else []
+
+    with _ANALYSIS_LOCK:
+        _ANALYSIS[key] = (tree_meta, rows, alias_rows)
+        while len(_ANALYSIS) > ANALYSIS_CACHE_SIZE:
+            _ANALYSIS.popitem(last=False)
+    return tree_meta, rows or [], alias_rows or []
+
+
+def _own_meta(tree_meta: Dict) -> Dict:
+    """
+    Kopie für den code_tree eines Laufs: verändert wird später nur
+    functions[*]["out_calls"] (_link_calls), daher werden nur diese Dicts
+    und Listen kopiert; der Rest bleibt mit dem Cache geteilt.
+    """
+    if "functions" not in tree_meta:
+        return dict(tree_meta)
+    return {
+        **tree_meta,
+        "functions": {
+            fn: {**fn_meta, "out_calls": list(fn_meta.get("out_calls", ()))}
+            for fn, fn_meta in tree_meta["functions"].items()
+        },
+    }
+
+
+def _analyse_tree(tree: Dict, canonical: Dict[str, str], stats=None, detailed: bool = True,
+                  pause: Optional[Callable[[], None]] = None) -> Tuple[Dict, List[Dict], List[Dict]]:
+    """
+    code_tree, analysis_rows und alias_warnings für alle Dateien in `tree`
+    (die beiden Listen nur mit detailed=True).
+    Ergebnisse je eindeutigem Inhalt: Kopien im selben Lauf teilen sie,
+    über Läufe hinweg hilft der prozessweite Analyse-Cache (_analyse_file).
+    """
+    code_tree: Dict = {}
+    analysis_rows: List[Dict] = []
+    alias_warnings: List[Dict] = []
+    analysed: Dict[Tuple[str, str], Tuple[Dict, List[Dict], List[Dict]]] = {}
+
+    for rel_path, text in _iterate_files_with_content(tree):
+        if pause is not None:
+            pause()
+        suffix = Path(rel_path).suffix.lower()
+        blob = (canonical.get(rel_path, rel_path), suffix)
+        cached = analysed.get(blob)
+        if cached is None:
+            cached = analysed[blob] = _analyse_file(rel_path, text, suffix, detailed)
+        tree_meta, rows, alias_rows = cached
+
+        code_tree[rel_path] = _own_meta(tree_meta)
+        if stats is not None and detailed:
+            stats.set_analysis(rel_path, len(tree_meta.get("functions", {})),
+                               len({r["class"] for r in rows if r.get("class")}))
+        analysis_rows.extend({**r, "file": rel_path} for r in rows)
+        alias_warnings.extend({**r, "file": rel_path} for r in alias_rows)
+
+    analysis_rows.sort(key=lambda r: (r["file"], r.get("lineno", 0)))
+    return code_tree, analysis_rows, alias_warnings
+
+
+def _link_calls(code_tree: Dict, module_graph: modgraph_service.ModuleGraph) -> None:
+    """
+    Call Graph Verlinkung: "from x import f [as g]" + Aufruf f() bzw. g() →
+    Funktion f in x. out_calls: (ziel_datei, funktion, aufgerufener_name).
+    """
+    for src_rel, meta in code_tree.items():
+        bound = module_graph.bindings.get(src_rel, {})
+        if not bound: continue
+        for fn_meta in meta.get("functions", {}).values():
+            for call in fn_meta.get("calls", []):
+                dst, name = bound.get(call, (None, None))
+                if dst and dst != src_rel and name in code_tree[dst].get("functions", {}):
+                    fn_meta.setdefault("out_calls", []).append((dst, name, call))
+
+
+def _store_index(project_key: str, commit: str, code_tree: Dict, analysis_rows: List[Dict]) -> None:
+    try:
+        index_service.store_analysis(project_key, commit, code_tree, analysis_rows)
+    except (sqlite3.Error, OSError) as exc:
+        print(f"[repo_service] Index-Fehler: {exc}")
+
+
+# Laufende Hintergrund-Indizierungen (projekt, commit)
+_INDEXING: Set[Tuple[str, str]] = set()
+_INDEXING_LOCK = threading.Lock()
+
+
+def _index_in_background(project_key: str, commit: str, full_tree: Dict,
+                         canonical: Dict[str, str], stats=None) -> None:
+    """
+    Analysiert das ganze Archiv für den SQLite-Index in einem Daemon-Thread,
+    damit eine Anfrage mit Teilauswahl nicht darauf wartet. Je Projekt und
+    Commit läuft höchstens ein solcher Thread.
+    """
+    job = (project_key, commit)
+    with _INDEXING_LOCK:
+        if job in _INDEXING:
+            return
+        _INDEXING.add(job)
+
+    def run() -> None:
+        try:
+            if index_service.is_indexed(project_key, commit):
+                return
+            code_tree, rows, _ = _analyse_tree(full_tree, canonical, stats)
+            _link_calls(code_tree, modgraph_service.build(code_tree))
+            _store_index(project_key, commit, code_tree, rows)
+        finally:
+            with _INDEXING_LOCK:
+                _INDEXING.discard(job)
+
+    threading.Thread(target=run, name="gitload-index", daemon=True).start()
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Commit-Kennung eines Archivs
+# ════════════════════════════════════════════════════════════════════
+def _commit_id(zip_file: zipfile.ZipFile, content: bytes) -> str:
+    """
+    GitHub/GitLab-Archive tragen den Commit-SHA im ZIP-Kommentar bzw. im
+    Namen des Root-Ordners (owner-repo-<sha>/). Fallback: Hash des Archivs.
+    """
+    comment = zip_file.comment.decode("ascii", errors="ignore").strip()
+    if re.fullmatch(r"[0-9a-f]{40}", comment):
+        return comment
+
+    names = zip_file.namelist()
+    if names:
+        m = re.search(r"-([0-9a-f]{7,40})$", names[0].split("/")[0])
+        if m:
+            return m.group(1)
+
+    return hashlib.sha1(content).hexdigest()
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Archiv-Download mit ETag-Cache
+# ════════════════════════════════════════════════════════════════════
+# Obergrenze für alle im Prozess gehaltenen Archive zusammen (Bytes)
+ARCHIVE_CACHE_BYTES = 256 * 1024 * 1024
+
+# (URL, Token-Hash) -> (ETag, Archiv); ein Token sieht nie das Archiv eines anderen
+_ARCHIVES: "OrderedDict[Tuple[str, str], Tuple[str, bytes]]" = OrderedDict()
+_ARCHIVES_LOCK = threading.Lock()
+_archive_bytes = 0
+
+
+def _download_archive(repo_url: str, token: str) -> bytes:
+    """
+    Lädt das Archiv; ist es bereits im Cache, wird per If-None-Match
+    nachgefragt und bei 304 der Cache-Inhalt verwendet.
+    Wirft RequestException bei Fehlern.
+    """
+    global _archive_bytes
+    key = (repo_url, hashlib.sha256(token.encode("utf-8")).hexdigest())
+    headers = {"Authorization": f"token {token}"}
+    with _ARCHIVES_LOCK:
+        cached = _ARCHIVES.get(key)
+    if cached and cached[0]:
+        headers["If-None-Match"] = cached[0]
+
+    response = requests.get(repo_url, headers=headers, timeout=15)
+    if response.status_code == 304 and cached:
+        content = cached[1]
+    else:
+        response.raise_for_status()
+        content = response.content
+
+    with _ARCHIVES_LOCK:
+        etag = response.headers.get("ETag") or (cached[0] if cached else "")
+        old = _ARCHIVES.pop(key, None)
+        if old is not None:
+            _archive_bytes -= len(old[1])
+        # größer als das ganze Budget → nicht cachen
+        if len(content) <= ARCHIVE_CACHE_BYTES:
+            _ARCHIVES[key] = (etag, content)
+            _archive_bytes += len(content)
+        while _archive_bytes > ARCHIVE_CACHE_BYTES:
+            _, (_, evicted) = _ARCHIVES.popitem(last=False)
+            _archive_bytes -= len(evicted)
+    return content
+
+
 # ════════════════════════════════════════════════════════════════════
 #  Haupt-Funktionen
 # ════════════════════════════════════════════════════════════════════
 
 def get_flat_file_list(repo_url: str, token: str) -> List[str]:
-    headers = {"Authorization": f"token {token}"}
     try:
-        r = requests.get(repo_url, headers=headers, timeout=15)
-        r.raise_for_status()
+        content = _download_archive(repo_url, token)
     except RequestException:
         return []
 
     try:
-        zf = zipfile.ZipFile(io.BytesIO(r.content))
+        zf = zipfile.ZipFile(io.BytesIO(content))
         return [i.filename.rstrip("/") for i in zf.infolist() if not i.is_dir()]
     except zipfile.BadZipFile:
         return []
 
+def prefetch(repo_url: str, token: str, project_key: str, last_commit: Optional[str] = None,
+             pause: Optional[Callable[[], None]] = None) -> Dict:
+    """
+    Hintergrund-Aufwärmen: Archiv per If-None-Match holen und bei neuem
+    Commit eine Vollanalyse fahren. Füllt Archiv-, Such- und Analyse-Cache
+    sowie den SQLite-Index. `pause` wird während der Analyse regelmäßig
+    aufgerufen (Vorrang für interaktive Anfragen).
+    """
+    content = _download_archive(repo_url, token)
+    commit = _commit_id(zipfile.ZipFile(io.BytesIO(content)), content)
+
+    changed = commit != last_commit
+    if changed:
+        # Texte (Inhalt, Handover) werden hier nicht gebraucht → nur als Funktionen
+        get_zip_full_output(repo_url, token, None, analyse=True, project_key=project_key,
+                            lazy_texts=True, pause=pause)
+    return {"commit": commit, "changed": changed}
+
+def _open_archive(repo_url: str, token: str):
+    try:
+        content = _download_archive(repo_url, token)
+        zip_file = zipfile.ZipFile(io.BytesIO(content))
+    except (RequestException, zipfile.BadZipFile) as exc:
+        print(f"[repo_service] Archiv nicht verfügbar: {exc}")
+        return None, None
+    return zip_file, _commit_id(zip_file, content)
+
+def _stats_from_directory(zip_file: zipfile.ZipFile) -> stats_service.StatsIndex:
+    """Statistik nur aus dem ZIP-Verzeichnis (Größen), ohne die Member zu lesen."""
+    stats = stats_service.StatsIndex(MAX_FILE_BYTES)
+    for info in zip_file.infolist():
+        if not info.is_dir():
+            stats.add(info.filename.rstrip("/"), info.file_size)
+    return stats
+
+def get_search_index(repo_url: str, token: str) -> Optional[search_service.TrigramIndex]:
+    """
+    Trigramm-Index des aktuellen Archivs (je Commit gecacht). Wird sonst
+    nebenbei in get_zip_full_output aufgebaut; hier nur, falls er fehlt.
+    """
+    zip_file, commit = _open_archive(repo_url, token)
+    if zip_file is None:
+        return None
+
+    index = search_service.get(commit)
+    if index is None:
+        index = search_service.TrigramIndex()
+        blobs = _BlobIndex(zip_file, MAX_FILE_BYTES)
+        for info in zip_file.infolist():
+            if info.is_dir():
+                continue
+            norm = info.filename.rstrip("/")
+            with zip_file.open(info) as f:
+                text = blobs.add(info, norm, f.read(MAX_FILE_BYTES))
+            index.add(norm, text, blobs.canonical[norm])
+        search_service.put(commit, index)
+    return index
+
+def get_stats(repo_url: str, token: str) -> Optional[stats_service.StatsIndex]:
+    """
+    Statistik-Index des aktuellen Archivs (je Commit gecacht), z.B. für den
+    Dateipicker. Fehlt er, wird er nur aus dem ZIP-Verzeichnis aufgebaut;
+    Zeilen/Binär bzw. Funktionen/Klassen ergänzt der nächste Lauf von
+    get_zip_full_output.
+    """
+    zip_file, commit = _open_archive(repo_url, token)
+    if zip_file is None:
+        return None
+
+    stats = stats_service.get(commit)
+    if stats is None:
+        stats = _stats_from_directory(zip_file)
+        stats_service.put(commit, stats)
+    return stats
+
 def get_zip_full_output(
     repo_url: str,
     token: str,
-    selected_paths: Optional[List[str]] = None,
+    selected_paths: Optional[Union[List[str], selection_service.Selection]] = None,
     analyse: bool = False,
-) -> Tuple[str, str, str, str, List[Dict], Dict, List[Dict], List[Dict]]:
-    
-    headers = {"Authorization": f"token {token}"}
+    project_key: Optional[str] = None,
+    dedupe_handover: bool = False,
+    lazy_texts: bool = False,
+    pause: Optional[Callable[[], None]] = None,
+) -> Tuple[str, str, str, str, List[Dict], Dict, List[Dict], List[Dict], Optional[str],
+           Optional[modgraph_service.ModuleGraph]]:
+    """
+    Lädt das Archiv und erzeugt alle Ausgaben. Die beiden letzten
+    Rückgabewerte sind die Commit-Kennung des Archivs (siehe _commit_id)
+    und der Modulgraph (nur mit analyse=True, sonst None). Mit analyse=True und
+    project_key wird das Ergebnis zusätzlich im SQLite-Index des Commits
+    abgelegt (siehe index_service); bei Teilauswahl analysiert dafür ein
+    Hintergrund-Thread das übrige Archiv.
+    Inhaltsgleiche Dateien werden nur einmal dekodiert und analysiert;
+    mit dedupe_handover=True erscheinen sie im Handover nur als Verweis.
+    Mit lazy_texts=True sind content_str, handover_md und handover_clean_md
+    Funktionen ohne Argumente, die den Text erst beim Aufruf erzeugen (z.B.
+    beim Streamen eines Exports). `pause` (optional) wird je Datei aufgerufen
+    und darf blockieren, um anderen Arbeiten den Vortritt zu lassen.
+    """
     try:
-        response = requests.get(repo_url, headers=headers, timeout=15)
-        response.raise_for_status()
+        archive = _download_archive(repo_url, token)
     except RequestException as exc:
         print(f"[repo_service] Download-Fehler: {exc}")
-        return None, None, None, None, [], {}, [], []
+        return None, None, None, None, [], {}, [], [], None, None
 
     try:
-        zip_file = zipfile.ZipFile(io.BytesIO(response.content))
+        zip_file = zipfile.ZipFile(io.BytesIO(archive))
+        commit = _commit_id(zip_file, archive)
+        # Such- und Statistik-Index nebenbei aufbauen, falls für diesen Commit noch keiner existiert
+        search_index = None if search_service.get(commit) else search_service.TrigramIndex()
+        stats = stats_service.get(commit)
+        if stats is None:
+            stats = _stats_from_directory(zip_file)
+            stats_service.put(commit, stats)
         full_tree: Dict = {}
         selected_tree: Dict = {}
         filter_all = selected_paths is None
+        # Auswahl-Set (Präfix-Trie) direkt verwenden, Pfadlisten als Menge
+        selected_set = (selected_paths if isinstance(selected_paths, selection_service.Selection)
+                        else set(selected_paths or []))
+        blobs = _BlobIndex(zip_file, MAX_FILE_BYTES)
+        total_files = selected_files = 0
 
         # ── ZIP entpacken
         for info in zip_file.infolist():
@@ -196,18 +586,29 @@ def get_zip_full_output(
                 cur.setdefault(parts[-1], {})
                 continue
 
+            if pause is not None:
+                pause()
+            norm = info.filename.rstrip("/")
             with zip_file.open(info) as f:
-                content = f.read(50_000).decode("utf-8", errors="ignore")
+                raw = f.read(MAX_FILE_BYTES)
+            content = blobs.add(info, norm, raw)
             cur[parts[-1]] = content
+            if search_index is not None:
+                search_index.add(norm, content, blobs.canonical[norm])
+            stats.set_content(norm, raw, content)
 
             # Auswahl
-            norm = info.filename.rstrip("/")
-            if filter_all or norm in (selected_paths or []):
+            total_files += 1
+            if filter_all or norm in selected_set:
+                selected_files += 1
                 cur = selected_tree
                 for part in parts[:-1]:
                     cur = cur.setdefault(part, {})
                 cur[parts[-1]] = content
 
+        if search_index is not None:
+            search_service.put(commit, search_index)
+
         tree_focus = selected_tree if not filter_all else full_tree
 
         # ── Strings generieren (Inhalt)
@@ -223,37 +624,19 @@ def get_zip_full_output(
                     lines.append(f'{ind}  "{v}"')
             return lines
 
-        content_str = "\n".join(_fmt_content(tree_focus))
-
         # ════════════════════════════════════════════════════════════════════
         # ANALYSE & STRUKTUR (Geänderte Reihenfolge!)
         # Wir führen die Analyse JETZT aus, damit wir den detaillierten Baum 
         # (mit Funktionen) schon für die Markdown-Generierung nutzen können.
         # ════════════════════════════════════════════════════════════════════
         
-        analysis_rows = []
-        code_tree = {}
-        alias_warnings = []
         import_conflicts = []
+        module_graph = None
 
-        # Wir laufen über alle Dateien für die Analyse (auch wenn analyse=False, 
-        # holen wir zumindest den Tree für die Optik, sofern Analyzer vorhanden)
-        for rel_path, text in _iterate_files_with_content(tree_focus):
-            suffix = Path(rel_path).suffix.lower()
-            analyzer = REGISTRY[suffix]
-            
-            # Code Tree immer befüllen für die Visualisierung
-            if hasattr(analyzer, "analyse_tree"):
-                code_tree[rel_path] = analyzer.analyse_tree(rel_path, text)
-            else:
-                # Falls kein Analyzer für Dateityp da ist, leeren Eintrag, damit Datei existiert
-                code_tree[rel_path] = {} 
-
-            # Detaillierte Analyse nur wenn angefordert
-            if analyse:
-                analysis_rows.extend(analyzer.analyse(rel_path, text))
-                if hasattr(analyzer, "analyse_aliases"):
-                    alias_warnings.extend(analyzer.analyse_aliases(rel_path, text))
+        # Analyse über alle gewählten Dateien (auch wenn analyse=False, holen
+        # wir zumindest den Tree für die Optik, sofern Analyzer vorhanden)
+        code_tree, analysis_rows, alias_warnings = _analyse_tree(
+            tree_focus, blobs.canonical, stats, detailed=analyse, pause=pause)
 
         # ── Struktur-String generieren (jetzt mit format_directory_tree)
         if code_tree:
@@ -272,62 +655,38 @@ def get_zip_full_output(
                 return lines
             structure_str = "\n".join(_fmt_simple(tree_focus))
 
-        # ── HANDOVER MARKDOWN (Nutzt jetzt den detaillierten structure_str)
-        # 1. Normal (mit Kommentaren)
-        handover_md = _generate_markdown_handover(tree_focus, structure_str, clean_mode=False)
-        
-        # 2. Clean (OHNE Kommentare)
-        handover_clean_md = _generate_markdown_handover(tree_focus, structure_str, clean_mode=True)
-
-        # ── Nacharbeiten Analyse (Sortierung, Konflikte)
+        # ── INHALT + HANDOVER MARKDOWN (reine String-Arbeit → seriell)
+        # Normal (mit Kommentaren) und Clean (OHNE Kommentare)
+        canonical = blobs.canonical if dedupe_handover else None
+        texts = (
+            lambda: "\n".join(_fmt_content(tree_focus)),
+            lambda: _generate_markdown_handover(
+                tree_focus, structure_str, clean_mode=False, canonical=canonical),
+            lambda: _generate_markdown_handover(
+                tree_focus, structure_str, clean_mode=True, canonical=canonical),
+        )
+        if not lazy_texts:
+            texts = tuple(make() for make in texts)
+        content_str, handover_md, handover_clean_md = texts
+
+        # ── Nacharbeiten Analyse (Modulgraph, Konflikte, Verlinkung)
         if analyse:
-            analysis_rows.sort(key=lambda r: (r["file"], r.get("lineno", 0)))
-
-            # Import Konflikte
-            imports_rows = [
-                {"file": rel, **imp} for rel, info in code_tree.items() 
-                for imp in info.get("imports", [])
-            ]
-            name2modules = defaultdict(set)
-            for imp in imports_rows:
-                n = imp.get("alias") or imp.get("name")
-                if n: name2modules[n].add(imp.get("module", ""))
-            
-            for imp in imports_rows:
-                n = imp.get("alias") or imp.get("name")
-                mods = name2modules.get(n, set())
-                if n and len(mods) > 1:
-                    import_conflicts.append({
-                        "file": imp["file"], "lineno": imp["lineno"],
-                        "name": n, "modules": sorted(mods)
-                    })
-
-            # Call Graph Verlinkung
-            def _alias_map(meta):
-                al = {}
-                for imp in meta.get("imports", []):
-                    if imp.get("alias"):
-                        al[imp["alias"]] = imp["module"]
-                    elif imp["type"] == "from":
-                         n = imp.get("name")
-                         al[imp.get("alias") or n] = f"{imp['module']}.{n}".lstrip(".")
-                return al
-            
-            def _mod_to_rel(mod):
-                 return "/".join(mod.split(".")) + ".py" if mod.startswith("app.") else None
-
-            for src_rel, meta in code_tree.items():
-                aliases = _alias_map(meta)
-                for fn_meta in meta.get("functions", {}).values():
-                    for call in fn_meta.get("calls", []):
-                        tgt = aliases.get(call)
-                        if not tgt: continue
-                        dst = _mod_to_rel(tgt)
-                        if not dst: continue
-                        if call in code_tree.get(dst, {}).get("functions", {}):
-                            fn_meta.setdefault("out_calls", []).append((dst, call))
-
-        return structure_str, content_str, handover_md, handover_clean_md, analysis_rows, code_tree, alias_warnings, import_conflicts
+            # Modulgraph: ein Durchlauf über alle Imports (Auflösung, Konflikte, Zyklen)
+            module_graph = modgraph_service.build(code_tree)
+            import_conflicts = module_graph.import_conflicts()
+            _link_calls(code_tree, module_graph)
+
+            # Persistieren für Abfragen ohne erneute Analyse: der Index deckt
+            # immer das ganze Archiv ab und wird je Commit nur einmal geschrieben.
+            # Bei Teilauswahl läuft die Analyse des Rests im Hintergrund.
+            if project_key and not index_service.is_indexed(project_key, commit):
+                if tree_focus is full_tree or selected_files == total_files:
+                    _store_index(project_key, commit, code_tree, analysis_rows)
+                else:
+                    _index_in_background(project_key, commit, full_tree, blobs.canonical, stats)
+
+        return (structure_str, content_str, handover_md, handover_clean_md, analysis_rows, code_tree,
+                alias_warnings, import_conflicts, commit, module_graph)
 
     except zipfile.BadZipFile:
-        return None, None, None, None, [], {}, [], []
\ No newline at end of file
+        return None, None, None, None, [], {}, [], [], None, None
\ No newline at end of file
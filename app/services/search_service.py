@@ -0,0 +1,195 @@
+"""
+Trigramm-Volltextindex über die Archiv-Inhalte.
+
+Aufbau beim Lesen der ZIP-Member (repo_service), ein Dokument je
+eindeutigem Inhalt (siehe _BlobIndex) mit allen Pfaden, die ihn teilen.
+Suchen: aus Literal bzw. Regex werden Pflicht-Trigramme abgeleitet,
+die Schnittmenge der Posting-Listen liefert Kandidaten, die danach gegen
+den gehaltenen Text verifiziert werden.
+
+Indizes werden je Commit in einem kleinen LRU-Cache gehalten.
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Wie viele Commits (Indizes) im Prozess gehalten werden
+CACHE_SIZE = 4
+
+_SPECIAL = set(".^$*+?{}[]()|\\")
+
+
+def _trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _required_literals(pattern: str) -> List[str]:
+    """
+    Literal-Stücke, die jeder Treffer des Regex enthalten muss.
+    Konservativ: Top-Level-Alternativen → keine Einschränkung; Gruppen,
+    Zeichenklassen und optionale Zeichen trennen Literale.
+    """
+    runs: List[str] = []
+    cur: List[str] = []
+    i, n, depth = 0, len(pattern), 0
+
+    def cut():
+        if cur:
+            runs.append("".join(cur))
+            cur.clear()
+
+    while i < n:
+        c = pattern[i]
+        if c == "\\" and i + 1 < n:
+            nxt = pattern[i + 1]
+            if depth == 0 and not nxt.isalnum():
+                cur.append(nxt)
+            else:
+                cut()
+            i += 2
+            continue
+        if c == "[":
+            cut()
+            j = i + 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 2 if pattern[j] == "\\" else 1
+            i = j + 1
+            continue
+        if c == "(":
+            depth += 1
+            cut()
+        elif c == ")":
+            depth = max(0, depth - 1)
+            cut()
+        elif c == "|" and depth == 0:
+            return []
+        elif c in "*?{":
+            if cur:
+                cur.pop()                      # vorheriges Zeichen optional
+            cut()
+            if c == "{":
+                j = pattern.find("}", i)
+                i = n if j < 0 else j + 1
+                continue
+        elif c in _SPECIAL:
+            cut()
+        elif depth == 0:
+            cur.append(c)
+        i += 1
+    cut()
+    return [r for r in runs if len(r) >= 3]
+
+
+class TrigramIndex:
+    def __init__(self):
+        self._docs: List[str] = []                  # doc_id -> Text
+        self._paths: List[List[str]] = []           # doc_id -> Pfade
+        self._doc_of: Dict[str, int] = {}           # erster Pfad -> doc_id
+        self._postings: Dict[str, Set[int]] = {}
+
+    def add(self, path: str, text: str, canonical: Optional[str] = None) -> None:
+        """Fügt eine Datei hinzu; Kopien (canonical != path) teilen das Dokument."""
+        doc = self._doc_of.get(canonical or path)
+        if doc is not None:
+            self._paths[doc].append(path)
+            return
+        doc = len(self._docs)
+        self._docs.append(text)
+        self._paths.append([path])
+        self._doc_of[path] = doc
+        postings = self._postings
+        for tri in _trigrams(text):
+            bucket = postings.get(tri)
+            if bucket is None:
+                postings[tri] = {doc}
+            else:
+                bucket.add(doc)
+
+    def __len__(self) -> int:
+        return sum(len(p) for p in self._paths)
+
+    def _candidates(self, literals: List[str]) -> Optional[Set[int]]:
+        tris = set()
+        for lit in literals:
+            tris |= _trigrams(lit)
+        if not tris:
+            return None                             # keine Einschränkung
+        buckets = sorted((self._postings.get(t, set()) for t in tris), key=len)
+        result = set(buckets[0])
+        for b in buckets[1:]:
+            if not result:
+                break
+            result &= b
+        return result
+
+    def search(self, query: str, regex: bool = False, ignore_case: bool = False,
+               max_files: int = 500, max_lines: int = 5) -> Tuple[List[Dict], bool]:
+        """
+        ([{"path", "count", "matches": [{"lineno", "line"}, ...]}, ...], truncated)
+        truncated: es gibt mehr als max_files Treffer-Dateien, die Liste ist
+        also unvollständig. re.error bei ungültigem Regex wird durchgereicht.
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        if regex:
+            rx = re.compile(query, flags | re.MULTILINE)
+            literals = _required_literals(query)
+        else:
+            rx = re.compile(re.escape(query), flags)
+            literals = [query]
+
+        cands = self._candidates(literals)
+        doc_ids = sorted(cands) if cands is not None else range(len(self._docs))
+
+        results: List[Dict] = []
+        for doc in doc_ids:
+            text = self._docs[doc]
+            matches = []
+            count = 0
+            for m in rx.finditer(text):
+                if m.start() == m.end():
+                    continue
+                count += 1
+                if len(matches) < max_lines:
+                    start = text.rfind("\n", 0, m.start()) + 1
+                    end = text.find("\n", m.start())
+                    line = text[start:end if end >= 0 else len(text)]
+                    matches.append({
+                        "lineno": text.count("\n", 0, m.start()) + 1,
+                        "line":   line.strip()[:200],
+                    })
+            if not count:
+                continue
+            for path in self._paths[doc]:
+                results.append({"path": path, "count": count, "matches": matches})
+            # einer über der Grenze genügt, um die Kürzung festzustellen
+            if len(results) > max_files:
+                break
+        results.sort(key=lambda r: r["path"])
+        return results[:max_files], len(results) > max_files
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Cache je Commit
+# ════════════════════════════════════════════════════════════════════
+_CACHE: "OrderedDict[str, TrigramIndex]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def get(commit: str) -> Optional[TrigramIndex]:
+    with _LOCK:
+        index = _CACHE.get(commit)
+        if index is not None:
+            _CACHE.move_to_end(commit)
+        return index
+
+
+def put(commit: str, index: TrigramIndex) -> None:
+    with _LOCK:
+        _CACHE[commit] = index
+        _CACHE.move_to_end(commit)
+        while len(_CACHE) > CACHE_SIZE:
+            _CACHE.popitem(last=False)
@@ -0,0 +1,160 @@
+"""
+Serverseitige Auswahl-Sets je Projekt.
+
+Eine Auswahl wird als Präfix-Trie aus Einschluss-/Ausschluss-Regeln
+gespeichert, z.B. ["+", "-tests/", "+tests/test_api.py"]: die längste
+passende Regel entscheidet, ohne Regel gilt "nicht ausgewählt". Pfade
+sind relativ zum Archiv-Wurzelordner (der trägt den Commit im Namen),
+damit gespeicherte Auswahlen über Commits hinweg gültig bleiben.
+
+    app/data/selections/<projekt>.json
+
+Die ID ist ein Hash der Regeln: gleiche Auswahl → gleiche ID.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from app.services.settings_service import data_dir
+
+# Unbenannte Auswahlen (aus dem Absenden des Pickers) je Projekt
+KEEP_UNNAMED = 20
+
+_LOCK = threading.Lock()
+
+
+def _trim(path: str) -> str:
+    parts = path.split("/", 1)
+    return parts[1] if len(parts) > 1 else path
+
+
+class Selection:
+    """Präfix-Trie; Knoten: {"s": True/False/None, "c": {teil: knoten}}."""
+
+    def __init__(self, rules: Iterable[str] = ()):
+        self._root: Dict = {"s": None, "c": {}}
+        self.rules: List[str] = []
+        for rule in rules:
+            self.add(rule[1:], rule[:1] == "+")
+
+    def add(self, prefix: str, include: bool) -> None:
+        node = self._root
+        for part in [p for p in prefix.split("/") if p]:
+            node = node["c"].setdefault(part, {"s": None, "c": {}})
+        node["s"] = include
+        self.rules.append(("+" if include else "-") + prefix)
+
+    def __contains__(self, path: str) -> bool:
+        node, state = self._root, self._root["s"]
+        for part in _trim(path).split("/"):
+            node = node["c"].get(part)
+            if node is None:
+                break
+            if node["s"] is not None:
+                state = node["s"]
+        return bool(state)
+
+    @property
+    def id(self) -> str:
+        return hashlib.sha1("\n".join(sorted(self.rules)).encode("utf-8")).hexdigest()[:12]
+
+
+def compress(all_paths: Iterable[str], selected: Iterable[str]) -> Selection:
+    """
+    Kleinste Regelmenge (je Ordner) für `selected` innerhalb `all_paths`:
+    volle/leere Ordner werden eine Regel, gemischte Ordner übernehmen den
+    Mehrheitszustand und werden rekursiv verfeinert.
+    """
+    chosen = {_trim(p) for p in selected}
+    tree: Dict = {}
+    for path in all_paths:
+        rel = _trim(path)
+        node = tree
+        for part in rel.split("/")[:-1]:
+            node = node.setdefault(part + "/", {})
+        node[rel.split("/")[-1]] = rel in chosen
+
+    def counts(node) -> tuple:
+        sel = total = 0
+        for child in node.values():
+            s, t = counts(child) if isinstance(child, dict) else (int(child), 1)
+            sel, total = sel + s, total + t
+        node[None] = (sel, total)
+        return sel, total
+
+    counts(tree)
+    sel = Selection()
+
+    def walk(node: Dict, prefix: str, inherited: bool) -> None:
+        s, t = node[None]
+        state = s * 2 >= t if 0 < s < t else s == t
+        if state != inherited:
+            sel.add(prefix, state)
+        if 0 < s < t:
+            for name, child in sorted((k, v) for k, v in node.items() if k is not None):
+                if isinstance(child, dict):
+                    walk(child, prefix + name, state)
+                elif child != state:
+                    sel.add(prefix + name, child)
+
+    if tree:
+        walk(tree, "", False)
+    return sel
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Ablage je Projekt
+# ════════════════════════════════════════════════════════════════════
+def _path(project: str) -> Path:
+    folder = data_dir() / "selections"
+    folder.mkdir(exist_ok=True)
+    return folder / (re.sub(r"[^A-Za-z0-9_.-]", "_", project) + ".json")
+
+
+def _read(project: str) -> Dict[str, Dict]:
+    try:
+        with open(_path(project), encoding="utf-8") as f:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def list_sets(project: str) -> List[Dict]:
+    """Benannte Auswahlen, neueste zuerst."""
+    sets = [{"id": k, **v} for k, v in _read(project).items() if v.get("name")]
+    return sorted(sets, key=lambda s: s.get("created", 0), reverse=True)
+
+
+def load(project: str, sel_id: str) -> Optional[Selection]:
+    entry = _read(project).get(sel_id)
+    return Selection(entry["rules"]) if entry else None
+
+
+def save(project: str, selection: Selection, name: str = "") -> str:
+    """Speichert die Auswahl (ein vorhandener Name bleibt erhalten) und liefert die ID."""
+    with _LOCK:
+        data = _read(project)
+        entry = data.setdefault(selection.id, {"name": "", "rules": selection.rules})
+        entry["name"] = name or entry["name"]
+        entry["created"] = int(time.time())
+
+        unnamed = sorted((v["created"], k) for k, v in data.items() if not v.get("name"))
+        for _, k in unnamed[:-KEEP_UNNAMED]:
+            del data[k]
+
+        with open(_path(project), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+    return selection.id
+
+
+def delete(project: str, sel_id: str) -> None:
+    with _LOCK:
+        data = _read(project)
+        if data.pop(sel_id, None) is not None:
+            with open(_path(project), "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
@@ -2,25 +2,27 @@ import json
 from pathlib import Path
 from typing import Dict
 
-def _settings_path() -> str:
+def data_dir() -> Path:
     """
-    Ermittelt den Pfad zur settings.json.
+    Ordner für Laufzeitdaten (settings.json, Index-Datenbanken, ...).
     Struktur:
       app/
         services/
           settings_service.py  <-- Wir sind hier (__file__)
-        data/
-          settings.json        <-- Wir wollen hier hin
+        data/                  <-- Wir wollen hier hin
     """
     # 1. Parent = app/services
     # 2. Parent = app
     base_dir = Path(__file__).resolve().parent.parent
     
     # Ordner "data" innerhalb von "app"
-    data_dir = base_dir / "data"
-    data_dir.mkdir(exist_ok=True)
-    
-    return str(data_dir / "settings.json")
+    path = base_dir / "data"
+    path.mkdir(exist_ok=True)
+    return path
+
+def _settings_path() -> str:
+    """Ermittelt den Pfad zur settings.json (app/data/settings.json)."""
+    return str(data_dir() / "settings.json")
 
 def read_settings() -> Dict:
     path = _settings_path()
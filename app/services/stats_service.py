@@ -0,0 +1,122 @@
+"""
+Statistik-Index je Commit für den Dateipicker.
+
+Je Datei: Bytes und Gekürzt-Flag aus dem ZIP-Verzeichnis (ohne Lesen der
+Member, daher billig genug für das Öffnen des Pickers) sowie geschätzte
+Tokens des übernommenen Teils. Zeilen und Binär-Flag kommen hinzu, sobald
+ein Lauf die Member liest, Funktionen/Klassen sobald eine Analyse lief
+(repo_service). Aggregiert je Ordner und je Commit in einem kleinen
+LRU-Cache gehalten; Änderungen laufen unter einem Lock, da der Index
+zwischen Requests geteilt ist.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+# Wie viele Commits im Prozess gehalten werden
+CACHE_SIZE = 4
+# Grobe Schätzung: ~4 Zeichen je Token
+CHARS_PER_TOKEN = 4
+# Bytes, die für die Binär-Erkennung geprüft werden
+BINARY_SNIFF = 8192
+
+_SUMS = ("files", "bytes", "lines", "tokens", "functions", "classes", "binary", "truncated")
+
+
+def estimate_tokens(chars: int) -> int:
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class StatsIndex:
+    def __init__(self, limit: int):
+        self.limit = limit                          # Bytes je Datei (Kürzung)
+        self.files: Dict[str, Dict] = {}            # Pfad -> Kennzahlen
+        self._dirs: Optional[Dict[str, Dict]] = None
+        self._lock = threading.Lock()
+
+    def add(self, path: str, size: int) -> None:
+        """Eintrag aus dem ZIP-Verzeichnis (file_size), ohne den Inhalt zu lesen."""
+        with self._lock:
+            self.files[path] = {
+                "bytes":     size,
+                "lines":     None,
+                "tokens":    estimate_tokens(min(size, self.limit)),
+                "binary":    None,
+                "truncated": size > self.limit,
+                "functions": None,
+                "classes":   None,
+            }
+            self._dirs = None
+
+    def set_content(self, path: str, raw: bytes, text: str) -> None:
+        """raw/text: der gelesene (ggf. gekürzte) Inhalt des Members."""
+        with self._lock:
+            entry = self.files.get(path)
+            if entry is None or entry["lines"] is not None:
+                return
+            entry["lines"] = text.count("\n") + (1 if text and not text.endswith("\n") else 0)
+            entry["tokens"] = estimate_tokens(len(text))
+            entry["binary"] = b"\x00" in raw[:BINARY_SNIFF]
+            self._dirs = None
+
+    def set_analysis(self, path: str, functions: int, classes: int) -> None:
+        with self._lock:
+            entry = self.files.get(path)
+            if entry is not None:
+                entry["functions"], entry["classes"] = functions, classes
+                self._dirs = None
+
+    def totals(self, paths: Iterable[str]) -> Dict[str, int]:
+        out = dict.fromkeys(_SUMS, 0)
+        with self._lock:
+            for path in paths:
+                entry = self.files.get(path)
+                if entry is None:
+                    continue
+                out["files"] += 1
+                for key in _SUMS[1:]:
+                    out[key] += int(entry[key] or 0)
+        return out
+
+    def directories(self) -> Dict[str, Dict[str, int]]:
+        """Ordner (mit abschließendem "/") -> Summen über alle enthaltenen Dateien."""
+        with self._lock:
+            if self._dirs is None:
+                dirs: Dict[str, Dict[str, int]] = {}
+                for path, entry in self.files.items():
+                    parts = path.split("/")[:-1]
+                    for i in range(1, len(parts) + 1):
+                        agg = dirs.setdefault("/".join(parts[:i]) + "/", dict.fromkeys(_SUMS, 0))
+                        agg["files"] += 1
+                        for key in _SUMS[1:]:
+                            agg[key] += int(entry[key] or 0)
+                self._dirs = dict(sorted(dirs.items()))
+            return self._dirs
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Kopie der Einträge je Datei (für Templates außerhalb des Locks)."""
+        with self._lock:
+            return {path: dict(entry) for path, entry in self.files.items()}
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Cache je Commit
+# ════════════════════════════════════════════════════════════════════
+_CACHE: "OrderedDict[str, StatsIndex]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def get(commit: str) -> Optional[StatsIndex]:
+    with _LOCK:
+        index = _CACHE.get(commit)
+        if index is not None:
+            _CACHE.move_to_end(commit)
+        return index
+
+
+def put(commit: str, index: StatsIndex) -> None:
+    with _LOCK:
+        _CACHE[commit] = index
+        _CACHE.move_to_end(commit)
+        while len(_CACHE) > CACHE_SIZE:
+            _CACHE.popitem(last=False)
@@ -1,16 +1,72 @@
 from pathlib import Path
-from typing import Dict, List, Union, Set
-from collections import defaultdict
+from typing import Callable, Dict, List, Union, Set, Optional, Tuple
+from collections import defaultdict, Counter, OrderedDict
 import re
+import threading
 
-def build_package_uml(code_tree: Dict[str, dict]) -> str:
-    # ── Hilfsfunktionen ──────────────────────────────────────────────
-    def esc(s: str) -> str:
-        return re.sub(r"[^A-Za-z0-9_]", "_", s)
+from app.utils import FragmentCache, merkle, indent_block
+from app.services import modgraph_service
 
-    def trim(rel: str) -> str:
-        parts = Path(rel).parts
-        return "/".join(parts[1:]) if len(parts) > 1 else rel
+# Name der Partition für Dateien direkt im Projekt-Root
+ROOT_PARTITION = "(root)"
+# Schlüssel des Übersichtsdiagramms in build_partitioned_uml()
+OVERVIEW = "__overview__"
+EXTERN_PARTITION = "externe Funktionen"
+# Gerenderte Pakete (Merkle-Hash → PlantUML-Fragment) für build_package_uml
+UML_CACHE_SIZE = 100_000
+_UML_FRAGMENTS = FragmentCache(UML_CACHE_SIZE)
+# Indizes zuletzt angezeigter Ergebnisse, aus denen Diagramme auf Abruf entstehen
+INDEX_CACHE_SIZE = 8
+_INDEXES: "OrderedDict[tuple, Dict]" = OrderedDict()
+_INDEXES_LOCK = threading.Lock()
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Hilfsfunktionen
+# ════════════════════════════════════════════════════════════════════
+def _esc(s: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_]", "_", s)
+
+
+def _trim(rel: str) -> str:
+    parts = Path(rel).parts
+    return "/".join(parts[1:]) if len(parts) > 1 else rel
+
+
+def _partition_of(rel_trim: str) -> str:
+    parts = rel_trim.split("/")
+    return parts[0] if len(parts) > 1 else ROOT_PARTITION
+
+
+def _module_label(module: str, target: Optional[str]) -> str:
+    """
+    Anzeigename eines importierten Moduls: Stamm der Ziel-Datei (bei
+    __init__/index der Ordner), für externe Module der letzte Namensteil.
+    """
+    if target:
+        path = Path(_trim(target))
+        if path.stem in ("__init__", "index") and path.parent.name:
+            return path.parent.name
+        return path.stem
+    name = module.rstrip("/").rsplit("/", 1)[-1]
+    if "/" in module:
+        return Path(name).stem or module
+    return name.strip(".").rsplit(".", 1)[-1] or module
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Index: einmal aus dem code_tree berechnet, von allen Diagrammen genutzt
+# ════════════════════════════════════════════════════════════════════
+def index_code_tree(code_tree: Dict[str, dict],
+                    module_graph: Optional[modgraph_service.ModuleGraph] = None) -> Dict:
+    """
+    Bereitet den code_tree einmalig auf. Alle Diagramme (gesamt, Übersicht,
+    Partitionen) werden unabhängig voneinander aus diesem Index erzeugt.
+    Imports werden über den Modulgraphen aufgelöst (ohne Graph wird er
+    hier aufgebaut).
+    """
+    if module_graph is None:
+        module_graph = modgraph_service.build(code_tree)
 
     # ── 0) Nested-Kinder global sammeln
     nested_children: Set[str] = {
@@ -21,96 +77,49 @@ def build_package_uml(code_tree: Dict[str, dict]) -> str:
     }
 
     # ── 1) Baum aufbauen
-    root = {}
+    root: Dict = {}
     for rel, meta in code_tree.items():
-        parts = Path(trim(rel)).parts
+        parts = Path(_trim(rel)).parts
         ptr = root
         for folder in parts[:-1]:
             ptr = ptr.setdefault(folder, {})
-        
+
         top_funcs = [
             fn for fn in meta.get("functions", {})
             if fn not in nested_children
         ]
         ptr[parts[-1]] = top_funcs
 
-    # ── 2) UML-Text
-    lines: List[str] = [
-        "@startuml",
-        "left to right direction",
-        'skinparam defaultFontName "Courier New"',
-    ]
-    trim2meta = {trim(rel): meta for rel, meta in code_tree.items()}
-
-    # ── 3) Rendern
-    def render(name: str, node: Union[dict, list], path_so_far: str, indent: str = "") -> None:
-        alias = esc(path_so_far or name)
-        lines.append(f'{indent}package "{name}" as {alias} {{')
-
-        if isinstance(node, dict):
-            for child, sub in sorted(node.items()):
-                new_path = f"{path_so_far}/{child}" if path_so_far else child
-                render(child, sub, new_path, indent + "  ")
-        elif node: 
-            nested_map = trim2meta.get(path_so_far, {}).get("nested", {})
-            
-            def render_fn(fn_name: str, alias_prefix: str, indent_fn: str) -> None:
-                children = nested_map.get(fn_name, [])
-                cur_prefix = f"{alias_prefix}__{fn_name}" if alias_prefix else f"{path_so_far}__{fn_name}"
-                cur_alias = esc(cur_prefix)
-
-                if children:
-                    lines.append(f'{indent_fn}package "{fn_name}()" as {cur_alias} {{')
-                    for child in sorted(children):
-                        render_fn(child, cur_prefix, indent_fn + "  ")
-                    lines.append(f'{indent_fn}}}')
-                else:
-                    lines.append(f'{indent_fn}component "{fn_name}()" as {cur_alias}')
-
-            for fn in sorted(node):
-                render_fn(fn, "", indent + "  ")
-        else:
-            placeholder = esc(f"{path_so_far}__file")
-            lines.append(f'{indent}  component "{name}" as {placeholder}')
-
-        lines.append(f"{indent}}}")
+    trim2meta = {_trim(rel): meta for rel, meta in code_tree.items()}
 
-    for top, sub in sorted(root.items()):
-        render(top, sub, top)
+    # ── 2) Alias-Tabellen
+    func2alias: Dict[str, str] = {}
+    file_of_alias: Dict[str, str] = {}
+    alias2file: Dict[str, str] = {}
+    alias2name: Dict[str, str] = {}
 
-    # ── 4-8) Alias & Kanten
-    func2alias = {}
-    file_of_alias = {}
-    
     for rel, meta in code_tree.items():
-        rel_trim = trim(rel)
-        mod_alias = esc(rel_trim)
+        rel_trim = _trim(rel)
+        mod_alias = _esc(rel_trim)
         for fn in meta.get("functions", {}):
-            alias = esc(f"{rel_trim}__{fn}")
+            alias = _esc(f"{rel_trim}__{fn}")
             func2alias[fn] = alias
             file_of_alias[alias] = mod_alias
+            alias2file[alias] = rel_trim
+            alias2name[alias] = fn
         for parent, inners in meta.get("nested", {}).items():
             for inner in inners:
-                alias = esc(f"{rel_trim}__{parent}__{inner}")
+                alias = _esc(f"{rel_trim}__{parent}__{inner}")
                 func2alias[inner] = alias
                 file_of_alias[alias] = mod_alias
+                alias2file[alias] = rel_trim
+                alias2name[alias] = inner
 
-    def resolve_module(origin, raw):
-        rel_trimmed = trim(origin)
-        base = Path("/".join(rel_trimmed.split("/")[:-1]))
-        level = len(raw) - len(raw.lstrip("."))
-        name  = raw.lstrip(".")
-        for _ in range(max(0, level - 1)):
-             base = base.parent
-        if name:
-            for part in name.split("."):
-                base = base / part
-        return base.stem
-
-    name2module = {}
+    name2module: Dict[str, str] = {}
     for origin, meta in code_tree.items():
-        for imp in meta.get("imports", []):
-            canon = resolve_module(origin, imp["module"])
+        targets = module_graph.import_targets.get(origin, [])
+        for i, imp in enumerate(meta.get("imports", [])):
+            canon = _module_label(imp["module"], targets[i] if i < len(targets) else None)
             if imp["type"] == "from":
                 n = imp.get("alias") or imp.get("name")
                 if n: name2module[n] = canon
@@ -119,27 +128,18 @@ def build_package_uml(code_tree: Dict[str, dict]) -> str:
                 name2module[alias] = canon
 
     all_calls = {
-        c for meta in code_tree.values() 
-        for fn_meta in meta.get("functions", {}).values() 
+        c for meta in code_tree.values()
+        for fn_meta in meta.get("functions", {}).values()
         for c in fn_meta.get("calls", [])
     }
     external_fns = sorted(c for c in all_calls if c not in func2alias and c in name2module)
     for fn in external_fns:
-        func2alias[fn] = esc(f"extern__{fn}")
-
-    if external_fns:
-        lines.append('\npackage "externe Funktionen" as externe {')
-        modules = defaultdict(list)
-        for fn in external_fns:
-            modules[name2module[fn]].append(fn)
-        for mod, fns in sorted(modules.items()):
-            pkg_alias = esc(f"externale__{mod}")
-            lines.append(f'  package "{mod}.py" as {pkg_alias} {{')
-            for fn in sorted(fns):
-                lines.append(f'    component "{fn}" as {func2alias[fn]}')
-            lines.append("  }")
-        lines.append("}\n")
+        alias = _esc(f"extern__{fn}")
+        func2alias[fn] = alias
+        alias2name[alias] = fn
 
+    # ── 3) Kanten (dateiübergreifend, dedupliziert)
+    edges: List[Tuple[str, str, str]] = []
     added = set()
     for rel, meta in code_tree.items():
         for fn, fn_meta in meta.get("functions", {}).items():
@@ -150,7 +150,367 @@ def build_package_uml(code_tree: Dict[str, dict]) -> str:
                 if file_of_alias.get(dst) == file_of_alias.get(src): continue
                 if (src, dst) in added: continue
                 added.add((src, dst))
-                lines.append(f"{src} ..> {dst} : {called}()")
+                edges.append((src, dst, called))
+
+    alias2part = {a: _partition_of(f) for a, f in alias2file.items()}
+    for fn in external_fns:
+        alias2part[func2alias[fn]] = EXTERN_PARTITION
+
+    return {
+        "root":          root,
+        "trim2meta":     trim2meta,
+        "func2alias":    func2alias,
+        "alias2name":    alias2name,
+        "alias2part":    alias2part,
+        "name2module":   name2module,
+        "external_fns":  external_fns,
+        "edges":         edges,
+    }
+
+
+def list_partitions(index: Dict) -> List[str]:
+    """Top-Level-Pakete (plus ggf. ROOT_PARTITION) in stabiler Reihenfolge."""
+    parts = {_partition_of(rel) for rel in index["trim2meta"]}
+    return sorted(parts)
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Render-Bausteine
+# ════════════════════════════════════════════════════════════════════
+def _header(title: str = "") -> List[str]:
+    lines = [
+        "@startuml",
+        "left to right direction",
+        'skinparam defaultFontName "Courier New"',
+    ]
+    if title:
+        lines.append(f"title {title}")
+    return lines
+
+
+class _Budget:
+    """Zählt gerenderte Knoten gegen ein optionales Limit."""
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.used = 0
+        self.skipped = 0
+        self.rendered: Set[str] = set()
+
+    def take(self, alias: str) -> bool:
+        if self.limit is not None and self.used >= self.limit:
+            self.skipped += 1
+            return False
+        self.used += 1
+        self.rendered.add(alias)
+        return True
+
+
+def _count_nested(nested_map: Dict[str, List[str]], fn_name: str) -> int:
+    todo, count = list(nested_map.get(fn_name, [])), 0
+    while todo:
+        count += 1
+        todo.extend(nested_map.get(todo.pop(), []))
+    return count
+
+
+def _render_node(lines: List[str], index: Dict, name: str, node: Union[dict, list],
+                 path_so_far: str, budget: _Budget, indent: str = "") -> None:
+    alias = _esc(path_so_far or name)
+    lines.append(f'{indent}package "{name}" as {alias} {{')
+
+    if isinstance(node, dict):
+        for child, sub in sorted(node.items()):
+            new_path = f"{path_so_far}/{child}" if path_so_far else child
+            _render_node(lines, index, child, sub, new_path, budget, indent + "  ")
+    elif node:
+        nested_map = index["trim2meta"].get(path_so_far, {}).get("nested", {})
+
+        def render_fn(fn_name: str, alias_prefix: str, indent_fn: str) -> None:
+            children = nested_map.get(fn_name, [])
+            cur_prefix = f"{alias_prefix}__{fn_name}" if alias_prefix else f"{path_so_far}__{fn_name}"
+            cur_alias = _esc(cur_prefix)
+            if not budget.take(cur_alias):
+                # ausgelassene verschachtelte Funktionen mitzählen
+                budget.skipped += _count_nested(nested_map, fn_name)
+                return
+
+            if children:
+                lines.append(f'{indent_fn}package "{fn_name}()" as {cur_alias} {{')
+                for child in sorted(children):
+                    render_fn(child, cur_prefix, indent_fn + "  ")
+                lines.append(f'{indent_fn}}}')
+            else:
+                lines.append(f'{indent_fn}component "{fn_name}()" as {cur_alias}')
+
+        for fn in sorted(node):
+            render_fn(fn, "", indent + "  ")
+    else:
+        placeholder = _esc(f"{path_so_far}__file")
+        lines.append(f'{indent}  component "{name}" as {placeholder}')
+
+    lines.append(f"{indent}}}")
+
+
+def _render_externals(lines: List[str], index: Dict, fns: List[str], budget: _Budget) -> None:
+    fns = [fn for fn in fns if budget.take(index["func2alias"][fn])]
+    if not fns:
+        return
+    lines.append('\npackage "externe Funktionen" as externe {')
+    modules = defaultdict(list)
+    for fn in fns:
+        modules[index["name2module"][fn]].append(fn)
+    for mod, mod_fns in sorted(modules.items()):
+        pkg_alias = _esc(f"externale__{mod}")
+        lines.append(f'  package "{mod}.py" as {pkg_alias} {{')
+        for fn in sorted(mod_fns):
+            lines.append(f'    component "{fn}" as {index["func2alias"][fn]}')
+        lines.append("  }")
+    lines.append("}\n")
+
+
+def _render_edges(lines: List[str], edges: List[Tuple[str, str, str]],
+                  max_edges: Optional[int]) -> None:
+    shown = edges if max_edges is None else edges[:max_edges]
+    for src, dst, called in shown:
+        lines.append(f"{src} ..> {dst} : {called}()")
+    if len(shown) < len(edges):
+        lines.append(f'note as edge_limit\n  {len(edges) - len(shown)} weitere Aufrufe ausgelassen (max_edges={max_edges})\nend note')
+
+
+def _node_limit_note(lines: List[str], budget: _Budget) -> None:
+    if budget.skipped:
+        lines.append(f'note as node_limit\n  {budget.skipped} weitere Knoten ausgelassen (max_nodes={budget.limit})\nend note')
+
+
+def _package_fragment(index: Dict, name: str, node: Union[dict, list],
+                      path_so_far: str) -> Tuple[bytes, str]:
+    """
+    Paket ohne Limits als (Merkle-Hash, Text), relativ eingerückt. Der Hash
+    enthält den Pfad (die Aliase hängen davon ab); Ordner hashen die Hashes
+    ihrer Kinder, so wird nach einer Änderung nur der Pfad zur Wurzel neu
+    gerendert.
+    """
+    if isinstance(node, dict):
+        children = []
+        for child, sub in sorted(node.items()):
+            new_path = f"{path_so_far}/{child}" if path_so_far else child
+            children.append(_package_fragment(index, child, sub, new_path))
+        digest = merkle("pkg", name, path_so_far, tuple(d for d, _ in children))
+        text = _UML_FRAGMENTS.get(digest)
+        if text is None:
+            lines = [f'package "{name}" as {_esc(path_so_far or name)} {{']
+            lines += [indent_block(t, "  ") for _, t in children]
+            lines.append("}")
+            text = _UML_FRAGMENTS.put(digest, "\n".join(lines))
+        return digest, text
+
+    nested_map = index["trim2meta"].get(path_so_far, {}).get("nested", {})
+    digest = merkle("file", name, path_so_far, tuple(node),
+                    tuple((fn, tuple(kids)) for fn, kids in nested_map.items()))
+    text = _UML_FRAGMENTS.get(digest)
+    if text is None:
+        lines: List[str] = []
+        _render_node(lines, index, name, node, path_so_far, _Budget(None))
+        text = _UML_FRAGMENTS.put(digest, "\n".join(lines))
+    return digest, text
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Diagramme
+# ════════════════════════════════════════════════════════════════════
+def build_package_uml(code_tree: Dict[str, dict], index: Optional[Dict] = None) -> str:
+    """Monolithisches Diagramm über alle Pakete (ohne Limits)."""
+    index = index or index_code_tree(code_tree)
+    budget = _Budget(None)
+
+    lines = _header()
+    for top, sub in sorted(index["root"].items()):
+        lines.append(_package_fragment(index, top, sub, top)[1])
+    _render_externals(lines, index, index["external_fns"], budget)
+    _render_edges(lines, index["edges"], None)
 
     lines.append("@enduml")
-    return "\n".join(lines)
\ No newline at end of file
+    return "\n".join(lines)
+
+
+def build_partition_uml(index: Dict, partition: str,
+                        max_nodes: Optional[int] = None,
+                        max_edges: Optional[int] = None) -> str:
+    """
+    Diagramm für ein Top-Level-Paket. Aufrufe in andere Pakete werden als
+    Stellvertreter-Knoten im jeweiligen Fremdpaket angezeigt.
+    """
+    budget = _Budget(max_nodes)
+    lines = _header(f"Paket {partition}")
+
+    root = index["root"]
+    if partition == ROOT_PARTITION:
+        for name, sub in sorted(root.items()):
+            if not isinstance(sub, dict):
+                _render_node(lines, index, name, sub, name, budget)
+    elif partition in root:
+        _render_node(lines, index, partition, root[partition], partition, budget)
+
+    # ── Kanten mit Bezug zur Partition, Fremdknoten einsammeln
+    alias2part = index["alias2part"]
+    edges = [e for e in index["edges"]
+             if alias2part.get(e[0]) == partition or alias2part.get(e[1]) == partition]
+
+    foreign: Dict[str, List[str]] = defaultdict(list)
+    seen: Set[str] = set()
+    for src, dst, _ in edges:
+        for alias in (src, dst):
+            part = alias2part.get(alias)
+            if part != partition and alias not in seen:
+                seen.add(alias)
+                foreign[part].append(alias)
+
+    extern_fns = [index["alias2name"][a] for a in foreign.pop(EXTERN_PARTITION, [])]
+    for part, aliases in sorted(foreign.items()):
+        aliases = [a for a in sorted(aliases) if budget.take(a)]
+        if not aliases:
+            continue
+        lines.append(f'package "{part}" as {_esc("partition__" + part)} #EEEEEE {{')
+        for a in aliases:
+            lines.append(f'  component "{index["alias2name"][a]}()" as {a}')
+        lines.append("}")
+    _render_externals(lines, index, extern_fns, budget)
+
+    edges = [e for e in edges if e[0] in budget.rendered and e[1] in budget.rendered]
+    _render_edges(lines, edges, max_edges)
+    _node_limit_note(lines, budget)
+
+    lines.append("@enduml")
+    return "\n".join(lines)
+
+
+def build_overview_uml(index: Dict,
+                       max_nodes: Optional[int] = None,
+                       max_edges: Optional[int] = None) -> str:
+    """Paket-Übersicht: dateiübergreifende Aufrufe aggregiert zu Paket → Paket (Anzahl)."""
+    alias2part = index["alias2part"]
+    counts: Counter = Counter()
+    for src, dst, _ in index["edges"]:
+        a, b = alias2part.get(src), alias2part.get(dst)
+        if a and b and a != b:
+            counts[(a, b)] += 1
+
+    files_per_part: Counter = Counter(_partition_of(rel) for rel in index["trim2meta"])
+    funcs_per_part: Counter = Counter(
+        alias2part[a] for a in index["alias2name"] if alias2part.get(a) != EXTERN_PARTITION
+    )
+
+    parts = list_partitions(index)
+    if index["external_fns"]:
+        parts.append(EXTERN_PARTITION)
+
+    budget = _Budget(max_nodes)
+    lines = _header("Paket-Übersicht")
+    for part in parts:
+        alias = _esc(f"partition__{part}")
+        if not budget.take(alias):
+            continue
+        if part == EXTERN_PARTITION:
+            label = f"{part}\\n{len(index['external_fns'])} Funktionen"
+        else:
+            label = f"{part}\\n{files_per_part[part]} Dateien, {funcs_per_part[part]} Funktionen"
+        lines.append(f'rectangle "{label}" as {alias}')
+
+    edges = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    shown = 0
+    for (a, b), n in edges:
+        src, dst = _esc(f"partition__{a}"), _esc(f"partition__{b}")
+        if src not in budget.rendered or dst not in budget.rendered:
+            continue
+        if max_edges is not None and shown >= max_edges:
+            break
+        lines.append(f"{src} ..> {dst} : {n}")
+        shown += 1
+    if shown < len(edges):
+        lines.append(f'note as edge_limit\n  {len(edges) - shown} weitere Paket-Kanten ausgelassen\nend note')
+    _node_limit_note(lines, budget)
+
+    lines.append("@enduml")
+    return "\n".join(lines)
+
+
+def build_partitioned_uml(code_tree: Dict[str, dict],
+                          max_nodes: Optional[int] = None,
+                          max_edges: Optional[int] = None,
+                          index: Optional[Dict] = None) -> Dict[str, str]:
+    """
+    Übersicht + ein Diagramm je Top-Level-Paket. Jede Partition wird
+    unabhängig aus demselben Index erzeugt (parallelisierbar / lazy abrufbar).
+    Ein bereits berechneter Index (index_code_tree) kann übergeben werden.
+    """
+    index = index or index_code_tree(code_tree)
+    out = {OVERVIEW: build_overview_uml(index, max_nodes, max_edges)}
+    for part in list_partitions(index):
+        out[part] = build_partition_uml(index, part, max_nodes, max_edges)
+    return out
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Diagramme auf Abruf (Artefakt-Namen, geteilter Index)
+# ════════════════════════════════════════════════════════════════════
+FULL_NAME = "uml.puml"
+
+
+def artifact_name(part: str) -> str:
+    """
+    Eindeutiger, dateinamensicherer Name je Diagramm. Partitionen liegen
+    unter "uml-pkg-", Zeichen außerhalb [A-Za-z0-9.-] (auch "_") werden als
+    _xx (UTF-8-Bytes hex) kodiert, damit z.B. "(root)" und "_root_" oder
+    ein Paket "overview" nicht zusammenfallen.
+    """
+    if part == OVERVIEW:
+        return "uml-overview.puml"
+    encoded = "".join(
+        ch if re.fullmatch(r"[A-Za-z0-9.-]", ch) else "".join(f"_{b:02x}" for b in ch.encode("utf-8"))
+        for ch in part
+    )
+    return f"uml-pkg-{encoded}.puml"
+
+
+def artifact_names(index: Dict) -> Dict[str, str]:
+    """Artefakt-Name → Beschriftung, Übersicht zuerst, Gesamtdiagramm zuletzt."""
+    names = {artifact_name(OVERVIEW): "Paket-Übersicht"}
+    names.update((artifact_name(part), f"Paket {part}") for part in list_partitions(index))
+    names[FULL_NAME] = "Gesamt"
+    return names
+
+
+def render_artifact(index: Dict, name: str,
+                    max_nodes: Optional[int] = None,
+                    max_edges: Optional[int] = None) -> Optional[str]:
+    """Diagramm zu einem Namen aus artifact_names(), sonst None."""
+    if name == FULL_NAME:
+        return build_package_uml({}, index)
+    if name == artifact_name(OVERVIEW):
+        return build_overview_uml(index, max_nodes, max_edges)
+    for part in list_partitions(index):
+        if name == artifact_name(part):
+            return build_partition_uml(index, part, max_nodes, max_edges)
+    return None
+
+
+def remember_index(key: tuple, index: Dict) -> None:
+    with _INDEXES_LOCK:
+        _INDEXES[key] = index
+        _INDEXES.move_to_end(key)
+        while len(_INDEXES) > INDEX_CACHE_SIZE:
+            _INDEXES.popitem(last=False)
+
+
+def cached_index(key: tuple, load: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+    """Index aus dem Cache, sonst über load() (z.B. aus code_tree.json) neu aufgebaut."""
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is not None:
+            _INDEXES.move_to_end(key)
+            return index
+    index = load()
+    if index is not None:
+        remember_index(key, index)
+    return index
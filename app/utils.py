@@ -1,9 +1,105 @@
 # app/utils.py
+import csv
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+# ════════════════════════════════════════════════════════════════════
+#  Fragment-Cache (Merkle-Hash eines Teilbaums → gerenderter Text)
+# ════════════════════════════════════════════════════════════════════
+class FragmentCache:
+    """
+    Prozessweiter LRU-Cache für gerenderte Teilbäume. Schlüssel ist ein
+    Merkle-Hash: Blätter hashen ihren analysierten Inhalt, Ordner die
+    (Name, Hash)-Paare ihrer Kinder. Ändert sich eine Datei, ändern sich
+    nur die Hashes auf dem Pfad von ihr zur Wurzel.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._data: "OrderedDict[bytes, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value: str) -> str:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+        return value
+
+
+def merkle(*parts) -> bytes:
+    """
+    128-Bit-BLAKE2b über Tupel aus Strings/Hashes. repr() ist für str,
+    bytes und Tupel eindeutig und dient als kanonische Kodierung. hash()
+    reicht nicht: der Cache ist projektübergreifend und groß, eine Kollision
+    würde stillschweigend fremden Text liefern.
+    """
+    return hashlib.blake2b(repr(parts).encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def indent_block(text: str, prefix: str) -> str:
+    """Setzt prefix vor jede Zeile eines (relativ gerenderten) Fragments."""
+    return prefix + text.replace("\n", "\n" + prefix) if text else ""
+
+
+# Fragmente (Dateien + Ordner) des Codebaums, prozessweit
+TREE_CACHE_SIZE = 100_000
+_TREE_FRAGMENTS = FragmentCache(TREE_CACHE_SIZE)
+
+
+def _tree_file_body(meta: dict) -> str:
+    """Funktionszeilen einer Datei, relativ zur Einrückung der Datei."""
+    out = []
+    nested_map = meta.get("nested", {})
+    nested_children = {c for lst in nested_map.values() for c in lst}
+    top_funcs = [
+        fn for fn in sorted(meta.get("functions", {}))
+        if fn not in nested_children
+    ]
+
+    def print_fn(fn_name, prefix, is_last):
+        route = meta["functions"][fn_name].get("route", "")
+        fn_br = "└── " if is_last else "├── "
+        out.append(f"{prefix}{fn_br}{fn_name}(){'  route: '+route if route else ''}")
+
+        kids = sorted(nested_map.get(fn_name, []))
+        if not kids: return
+        kid_pref_base = prefix + ("    " if is_last else "│   ")
+        for k, kid in enumerate(kids):
+            print_fn(kid, kid_pref_base, k == len(kids) - 1)
+
+    for j, fn in enumerate(top_funcs):
+        print_fn(fn, "", j == len(top_funcs) - 1)
+    return "\n".join(out)
+
+
+def _tree_file_digest(meta: dict) -> bytes:
+    functions = meta.get("functions", {})
+    return merkle(
+        "file",
+        tuple(functions),
+        tuple(m.get("route", "") for m in functions.values()),
+        tuple((fn, tuple(kids)) for fn, kids in meta.get("nested", {}).items()),
+    )
+
 
 def format_directory_tree(code_tree: dict) -> str:
     """
     Erzeugt den String für den Codebaum-Tab (Visualisierung).
     War früher inline in routes.py
+
+    Jeder Teilbaum wird relativ zu seiner Einrückung gerendert und unter
+    seinem Merkle-Hash gecacht (siehe FragmentCache).
     """
     # 1. Flaches Dict -> Baum
     def build_tree(flat: dict) -> dict:
@@ -16,44 +112,88 @@ def format_directory_tree(code_tree: dict) -> str:
             ptr[parts[-1]] = info
         return root
 
-    # 2. Baum -> String
-    def fmt_dir(node: dict, pref: str = "") -> list[str]:
-        out = []
+    # 2. Baum -> (Hash, Text); Ordner nur neu rendern, wenn ihr Hash fehlt
+    def fmt_dir(node: dict):
         keys = sorted(node)
-        for i, name in enumerate(keys):
-            last = i == len(keys) - 1
-            branch = "└── " if last else "├── "
-            next_pref = pref + ("    " if last else "│   ")
+        children = []
+        for name in keys:
             sub = node[name]
-
             if isinstance(sub, dict) and "functions" not in sub:
-                out.append(f"{pref}{branch}{name}/")
-                out.extend(fmt_dir(sub, next_pref))
-                continue
-
-            out.append(f"{pref}{branch}{name}")
-            
-            # Funktionen
-            nested_map = sub.get("nested", {})
-            nested_children = {c for lst in nested_map.values() for c in lst}
-            top_funcs = [
-                fn for fn in sorted(sub.get("functions", {})) 
-                if fn not in nested_children
-            ]
-
-            def print_fn(fn_name, prefix, is_last):
-                route = sub["functions"][fn_name].get("route", "")
-                fn_br = "└── " if is_last else "├── "
-                out.append(f"{prefix}{fn_br}{fn_name}(){'  route: '+route if route else ''}")
-                
-                kids = sorted(nested_map.get(fn_name, []))
-                if not kids: return
-                kid_pref_base = prefix + ("    " if is_last else "│   ")
-                for k, kid in enumerate(kids):
-                    print_fn(kid, kid_pref_base, k == len(kids) - 1)
-
-            for j, fn in enumerate(top_funcs):
-                print_fn(fn, next_pref, j == len(top_funcs) - 1)
-        return out
-
-    return "\n".join(fmt_dir(build_tree(code_tree)))
\ No newline at end of file
+                digest, body = fmt_dir(sub)
+                children.append((name + "/", digest, body))
+            else:
+                digest = _tree_file_digest(sub)
+                children.append((name, digest, None))
+
+        digest = merkle("dir", tuple((name, d) for name, d, _ in children))
+        text = _TREE_FRAGMENTS.get(digest)
+        if text is not None:
+            return digest, text
+
+        out = []
+        for i, (name, child_digest, body) in enumerate(children):
+            last = i == len(children) - 1
+            branch = "└── " if last else "├── "
+            out.append(f"{branch}{name}")
+            if body is None:
+                body = _TREE_FRAGMENTS.get(child_digest)
+                if body is None:
+                    body = _TREE_FRAGMENTS.put(child_digest, _tree_file_body(node[name]))
+            if body:
+                out.append(indent_block(body, "    " if last else "│   "))
+        return digest, _TREE_FRAGMENTS.put(digest, "\n".join(out))
+
+    return fmt_dir(build_tree(code_tree))[1]
+
+
+# ════════════════════════════════════════════════════════════════════
+#  Tabellen (Funktionsübersicht, Imports) – früher inline in routes.py
+# ════════════════════════════════════════════════════════════════════
+IMPORT_COLUMNS = ["file", "lineno", "type", "module", "name", "alias"]
+
+
+def collect_import_rows(code_tree: dict) -> list[dict]:
+    rows = [
+        {"file": rel, **imp}
+        for rel, info in code_tree.items()
+        for imp in info.get("imports", [])
+    ]
+    rows.sort(key=lambda r: (r["file"], r["lineno"]))
+    return rows
+
+
+def format_imports_tsv(imports_rows: list[dict]) -> str:
+    if not imports_rows:
+        return ""
+    lines = ["\t".join(IMPORT_COLUMNS)]
+    for r in imports_rows:
+        lines.append("\t".join(str(r.get(c, "")) for c in IMPORT_COLUMNS))
+    return "\n".join(lines)
+
+
+def function_columns(analysis_rows: list[dict]) -> list[str]:
+    if not analysis_rows:
+        return []
+    known = ["file", "func", "route", "class", "lineno"]
+    return [c for c in known if c in analysis_rows[0]] or list(analysis_rows[0].keys())
+
+
+def format_function_markdown(analysis_rows: list[dict]) -> str:
+    col_order = function_columns(analysis_rows)
+    if not col_order:
+        return ""
+    md_head = "| " + " | ".join(col_order) + " |"
+    md_sep  = "| " + " | ".join(["---"] * len(col_order)) + " |"
+    md_body = ["| " + " | ".join(str(r.get(c, "")) for c in col_order) + " |" for r in analysis_rows]
+    return "\n".join([md_head, md_sep, *md_body])
+
+
+def format_function_csv(analysis_rows: list[dict]) -> str:
+    col_order = function_columns(analysis_rows)
+    if not col_order:
+        return ""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=col_order, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(analysis_rows)
+    return buf.getvalue()
@@ -3,3 +3,15 @@ import os
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'supersecretkey'
+
+    # Obergrenzen je UML-Teildiagramm (Übersicht + ein Diagramm pro Top-Level-Paket)
+    UML_MAX_NODES = int(os.environ.get('UML_MAX_NODES', 400))
+    UML_MAX_EDGES = int(os.environ.get('UML_MAX_EDGES', 800))
+
+    # Antworten kleiner als diese Größe (Bytes) werden nicht komprimiert
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+
+    # Hintergrund-Prefetch der Projekte (0 = aus), Intervall/Jitter in Sekunden
+    PREFETCH_INTERVAL    = int(os.environ.get('PREFETCH_INTERVAL', 0))
+    PREFETCH_CONCURRENCY = int(os.environ.get('PREFETCH_CONCURRENCY', 1))
+    PREFETCH_JITTER      = int(os.environ.get('PREFETCH_JITTER', 30))